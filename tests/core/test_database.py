@@ -0,0 +1,154 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import open3d as o3d
+import pytest
+
+from tests.test_data import real_db
+from tests.utils import add_empty_frame, get_db_subset
+from vprdb.core import Database, VoxelGrid
+
+
+@pytest.mark.parametrize("voxel_size", [0.1, 0.3])
+def test_voxel_keys_match_down_sampling(voxel_size: float):
+    """
+    Voxel keys should be the same as for Open3D point clouds, and their number
+    should be equal to the number of points after voxel down sampling
+    """
+    min_bounds, max_bounds = real_db.bounds
+    voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
+    voxel_keys = real_db.get_voxel_keys(voxel_grid)
+    for i, (pose, pcd_raw) in enumerate(zip(real_db.trajectory, real_db.point_clouds)):
+        pcd = pcd_raw.point_cloud.transform(pose)
+        assert np.array_equal(voxel_keys[i], voxel_grid.get_occupied_voxels(pcd))
+        pcd = voxel_grid.voxel_down_sample(pcd)
+        assert len(voxel_keys[i]) == len(pcd.points)
+
+
+def test_voxel_keys_are_cached():
+    min_bounds, max_bounds = real_db.bounds
+    voxel_keys = real_db.get_voxel_keys(VoxelGrid(min_bounds, max_bounds, 0.3))
+    same_grid_keys = real_db.get_voxel_keys(VoxelGrid(min_bounds, max_bounds, 0.3))
+    assert voxel_keys is same_grid_keys
+
+
+@pytest.mark.parametrize("other_indices", [None, [1, 3, 4]])
+def test_overlap_matrix(other_indices):
+    """The overlap matrix should contain intersections of frames voxels"""
+    min_bounds, max_bounds = real_db.bounds
+    voxel_grid = VoxelGrid(min_bounds, max_bounds, 0.3)
+    other_db = None if other_indices is None else get_db_subset(real_db, other_indices)
+    intersections, sizes, other_sizes = real_db.overlap_matrix(voxel_grid, other_db)
+
+    voxel_keys = real_db.get_voxel_keys(voxel_grid)
+    other_keys = voxel_keys if other_db is None else other_db.get_voxel_keys(voxel_grid)
+    expected = np.asarray(
+        [
+            [len(np.intersect1d(voxels, other_voxels)) for other_voxels in other_keys]
+            for voxels in voxel_keys
+        ]
+    )
+    assert (intersections.toarray() == expected).all()
+    assert (sizes == [len(voxels) for voxels in voxel_keys]).all()
+    assert (other_sizes == [len(voxels) for voxels in other_keys]).all()
+
+
+@pytest.mark.parametrize("memory_limit", [1, 1 << 30])
+@pytest.mark.parametrize("tile_size", [0.5, 100.0])
+def test_voxel_map(tmp_path, memory_limit: int, tile_size: float):
+    """
+    Tiled map should contain the same voxels as the sparse map of the scene,
+    regardless of flushing tiles to the hard drive
+    """
+    db = Database(real_db.color_images, real_db.point_clouds, real_db.trajectory)
+    min_bounds, max_bounds = real_db.bounds
+    voxel_grid = VoxelGrid(min_bounds, max_bounds, 0.3)
+    voxel_map = db.build_voxel_map(voxel_grid, tile_size, memory_limit, tmp_path)
+    # Bounds are calculated in the same pass
+    assert db._bounds_cache is not None
+
+    expected_voxels = np.unique(np.concatenate(real_db.get_voxel_keys(voxel_grid)))
+    assert (voxel_map.get_voxels() == expected_voxels).all()
+    scene_points = np.concatenate(
+        [
+            pcd_raw.points_world(pose)
+            for pose, pcd_raw in zip(real_db.trajectory, real_db.point_clouds)
+        ]
+    )
+    sparse_map = voxel_grid.voxel_down_sample(
+        o3d.geometry.PointCloud(o3d.utility.Vector3dVector(scene_points))
+    )
+    assert len(voxel_map) == len(sparse_map.points)
+    assert (db.bounds[0] == min_bounds).all() and (db.bounds[1] == max_bounds).all()
+
+
+def test_trajectory_is_array():
+    db = Database(real_db.color_images, real_db.point_clouds, list(real_db.trajectory))
+    assert db.trajectory.shape == (len(real_db), 4, 4)
+    assert db.trajectory.flags.c_contiguous
+
+
+def test_subset_views():
+    voxel_grid = VoxelGrid(*real_db.bounds, 0.3)
+    voxel_keys = real_db.get_voxel_keys(voxel_grid)
+    view = real_db.subset([1, 2, 4])
+    view_of_view = view.subset([2, -3])
+    assert view_of_view.color_images.providers is real_db.color_images
+    assert view_of_view.color_images.indices.tolist() == [4, 1]
+    assert [pcd.path for pcd in view_of_view.point_clouds] == [
+        real_db.point_clouds[4].path,
+        real_db.point_clouds[1].path,
+    ]
+    assert (view_of_view.trajectory == real_db.trajectory[[4, 1]]).all()
+    # Voxel keys of the original DB are reused
+    view_voxel_keys = view_of_view.get_voxel_keys(voxel_grid)
+    assert view_voxel_keys[0] is voxel_keys[4] and view_voxel_keys[1] is voxel_keys[1]
+    with pytest.raises(IndexError):
+        view.subset([3])
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_iter_frames(workers: int):
+    frames = list(
+        real_db.iter_frames(
+            prefetch=2, workers=workers, fields=("color_image", "points_world")
+        )
+    )
+    assert [frame.index for frame in frames] == list(range(len(real_db)))
+    for frame, image, pcd, pose in zip(
+        frames, real_db.color_images, real_db.point_clouds, real_db.trajectory
+    ):
+        assert (frame.color_image == image.color_image).all()
+        assert (frame.points_world == pcd.points_world(pose)).all()
+        assert frame.point_cloud is None
+    with pytest.raises(ValueError):
+        real_db.iter_frames(fields=("depth",))
+
+
+def test_empty_frame(tmp_path):
+    """Frames without valid depth points should not affect the bounds and the map"""
+    db = add_empty_frame(real_db, tmp_path)
+    assert len(db.point_clouds[-1].points) == 0
+    min_bounds, max_bounds = real_db.bounds
+    assert np.array_equal(db.bounds[0], min_bounds)
+    assert np.array_equal(db.bounds[1], max_bounds)
+
+    voxel_grid = VoxelGrid(min_bounds, max_bounds, 0.3)
+    db = add_empty_frame(real_db, tmp_path)
+    voxel_map = db.build_voxel_map(voxel_grid)
+    assert np.array_equal(
+        voxel_map.get_voxels(), real_db.build_voxel_map(voxel_grid).get_voxels()
+    )
+    assert np.array_equal(db.bounds[0], min_bounds)
+    assert np.array_equal(db.bounds[1], max_bounds)
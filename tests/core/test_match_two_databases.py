@@ -0,0 +1,45 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import pytest
+
+from tests.test_data import real_db
+from tests.utils import generate_random_samples_of_test_db, get_db_subset
+from vprdb.core import calculate_point_cloud_coverage, match_two_databases, VoxelGrid
+
+
+@pytest.mark.parametrize("indices", generate_random_samples_of_test_db(5))
+def test_match_two_databases_exhaustive(indices):
+    """
+    Matches found with the inverted index should be the same
+    as the matches found with exhaustive comparison of point clouds
+    """
+    target_db = get_db_subset(real_db, indices)
+    min_bounds, max_bounds = real_db.bounds
+    voxel_grid = VoxelGrid(min_bounds, max_bounds, 0.3)
+
+    expected_matches = []
+    for pose, pcd_raw in zip(real_db.trajectory, real_db.point_clouds):
+        coverages = []
+        for target_pose, target_pcd in zip(
+            target_db.trajectory, target_db.point_clouds
+        ):
+            pcd_query = pcd_raw.point_cloud.transform(pose)
+            pcd_db = target_pcd.point_cloud.transform(target_pose)
+            coverages.append(
+                calculate_point_cloud_coverage(pcd_query, pcd_db, voxel_grid)
+            )
+        expected_matches.append(int(np.argmax(coverages)))
+
+    assert match_two_databases(real_db, target_db, voxel_grid) == expected_matches
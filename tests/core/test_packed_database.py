@@ -0,0 +1,102 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import pytest
+
+from tests.test_data import real_db
+from tests.utils import add_empty_frame
+from vprdb.core import Database, VoxelGrid
+from vprdb.providers import PointCloudProvider
+
+
+def test_packed_database(tmp_path):
+    min_bounds, max_bounds = real_db.bounds
+    voxel_grid = VoxelGrid(min_bounds, max_bounds, 0.3)
+    global_descriptors = np.random.rand(len(real_db), 16).astype(np.float32)
+    local_descriptors = [np.random.rand(i, 8) for i in range(len(real_db))]
+    real_db.save_packed(
+        tmp_path / "packed",
+        [voxel_grid],
+        {"netvlad": global_descriptors},
+        {"superpoint": local_descriptors},
+    )
+
+    packed_db = Database.open_packed(tmp_path / "packed")
+    assert len(packed_db) == len(real_db)
+    assert (packed_db.trajectory == np.asarray(real_db.trajectory)).all()
+    for i in range(len(real_db)):
+        assert packed_db.color_images[i].path.samefile(real_db.color_images[i].path)
+        assert packed_db.point_clouds[i].path.samefile(real_db.point_clouds[i].path)
+        assert (
+            packed_db.point_clouds[i].depth_scale == real_db.point_clouds[i].depth_scale
+        )
+    assert [p.path.name for p in packed_db.point_clouds[::2]] == [
+        p.path.name for p in real_db.point_clouds[::2]
+    ]
+
+    assert (packed_db.bounds[0] == min_bounds).all()
+    assert (packed_db.bounds[1] == max_bounds).all()
+    for packed_voxels, voxels in zip(
+        packed_db.get_voxel_keys(voxel_grid), real_db.get_voxel_keys(voxel_grid)
+    ):
+        assert isinstance(packed_voxels, np.memmap)
+        assert (packed_voxels == voxels).all()
+
+    assert (
+        packed_db.packed.get_global_descriptors("netvlad") == global_descriptors
+    ).all()
+    for packed_descriptors, descriptors in zip(
+        packed_db.packed.get_local_descriptors("superpoint"), local_descriptors
+    ):
+        assert (packed_descriptors == descriptors).all()
+    with pytest.raises(ValueError):
+        packed_db.packed.get_global_descriptors("cosplace")
+
+
+def test_mixed_point_clouds_are_not_packed(tmp_path):
+    point_clouds = real_db.point_clouds[:-1] + [PointCloudProvider(tmp_path / "0.pcd")]
+    mixed_db = Database(real_db.color_images, point_clouds, real_db.trajectory)
+    with pytest.raises(ValueError):
+        mixed_db.save_packed(tmp_path / "packed")
+
+
+def test_empty_packed_database(tmp_path):
+    empty_db = Database([], [], [])
+    voxel_grid = VoxelGrid.from_origin(0.3)
+    empty_db.save_packed(tmp_path / "packed", [voxel_grid], {}, {"superpoint": []})
+
+    packed_db = Database.open_packed(tmp_path / "packed")
+    assert len(packed_db) == 0
+    assert packed_db.packed.get_voxel_keys(voxel_grid) == []
+    assert packed_db.packed.get_local_descriptors("superpoint") == []
+    assert (packed_db.bounds[0] == 0).all() and (packed_db.bounds[1] == 0).all()
+
+
+def test_packed_database_with_empty_frames(tmp_path):
+    """Frames without valid points shouldn't affect the bounds of the packed DB"""
+    db = add_empty_frame(real_db, tmp_path)
+    db.save_packed(tmp_path / "packed")
+    packed_db = Database.open_packed(tmp_path / "packed")
+    for packed_bounds, bounds in zip(packed_db.bounds, real_db.bounds):
+        assert (packed_bounds == bounds).all()
+
+    empty_db = Database(db.color_images[-1:], db.point_clouds[-1:], db.trajectory[-1:])
+    empty_db.save_packed(tmp_path / "packed_empty")
+    packed_empty_db = Database.open_packed(tmp_path / "packed_empty")
+    for packed_bounds, bounds in zip(packed_empty_db.bounds, empty_db.bounds):
+        assert (bounds == 0).all()
+        assert (packed_bounds == bounds).all()
+    # Subsets of the packed DB use the stored boxes too
+    for packed_bounds in packed_db.subset([len(db) - 1]).bounds:
+        assert (packed_bounds == 0).all()
@@ -0,0 +1,71 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import open3d as o3d
+import pytest
+
+from vprdb.core import VoxelGrid
+
+rng = np.random.default_rng(0)
+points = rng.uniform(-50, 50, size=(1000, 3))
+
+
+@pytest.mark.parametrize("voxel_size", [0.1, 0.3, 2.0])
+def test_batch_voxel_indices(voxel_size: float):
+    """Batch methods should give the same results as the point-wise ones"""
+    voxel_grid = VoxelGrid(np.asarray([-10.0, -20.0, 5.0]), np.ones(3), voxel_size)
+    indices = voxel_grid.get_voxel_indices(points)
+    coordinates = voxel_grid.get_voxels_coordinates(points)
+    for point, index, coordinate in zip(points, indices, coordinates):
+        assert tuple(index) == voxel_grid.get_voxel_index(point)
+        assert tuple(coordinate) == voxel_grid.get_voxel_coordinates(point)
+
+
+@pytest.mark.parametrize("voxel_size", [0.1, 0.3, 2.0])
+def test_voxel_keys_unpacking(voxel_size: float):
+    voxel_grid = VoxelGrid(np.zeros(3), np.ones(3), voxel_size)
+    keys = voxel_grid.get_voxel_keys(points)
+    unpacked = VoxelGrid.unpack_voxel_keys(keys)
+    assert (unpacked == voxel_grid.get_voxel_indices(points)).all()
+
+
+def test_voxel_keys_order():
+    """Sorting of voxel keys should give the lexicographical order of indices"""
+    voxel_grid = VoxelGrid(np.zeros(3), np.ones(3), 0.3)
+    keys = voxel_grid.get_voxel_keys(points)
+    indices = voxel_grid.get_voxel_indices(points)
+    lexicographical_order = np.lexsort(indices.T[::-1])
+    assert (np.sort(keys) == keys[lexicographical_order]).all()
+
+
+def test_too_small_voxel_size():
+    voxel_grid = VoxelGrid(np.zeros(3), np.ones(3), 1e-6)
+    with pytest.raises(ValueError):
+        voxel_grid.get_voxel_keys(points)
+
+
+@pytest.mark.parametrize("origin", [None, [1.0, -2.0, 0.5]])
+def test_grid_from_origin(origin):
+    """Grid anchored at the origin should handle points on both sides of it"""
+    voxel_grid = VoxelGrid.from_origin(0.3, origin)
+    bounded_grid = VoxelGrid(
+        np.zeros(3) if origin is None else np.asarray(origin), np.ones(3), 0.3
+    )
+    assert (
+        voxel_grid.get_voxel_keys(points) == bounded_grid.get_voxel_keys(points)
+    ).all()
+
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+    down_sampled_pcd = voxel_grid.voxel_down_sample(pcd)
+    assert len(voxel_grid.get_occupied_voxels(pcd)) == len(down_sampled_pcd.points)
@@ -0,0 +1,75 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import pytest
+
+from tests.test_data import real_db
+from vprdb.core import (
+    calculate_iou,
+    calculate_point_cloud_coverage,
+    calculate_voxels_coverage,
+    calculate_voxels_coverages,
+    calculate_voxels_iou,
+    count_common_voxels,
+    VoxelGrid,
+)
+
+min_bounds, max_bounds = real_db.bounds
+voxel_grid = VoxelGrid(min_bounds, max_bounds, 0.3)
+pcds = [
+    pcd_raw.point_cloud.transform(pose)
+    for pose, pcd_raw in zip(real_db.trajectory, real_db.point_clouds)
+]
+
+
+@pytest.mark.parametrize("i, j", [(0, 1), (1, 4), (2, 3), (3, 3)])
+def test_coverage_and_iou(i: int, j: int):
+    """Voxel keys should give the same results as union of down sampled point clouds"""
+    pcd_1 = voxel_grid.voxel_down_sample(pcds[i])
+    pcd_2 = voxel_grid.voxel_down_sample(pcds[j])
+    united_size = len(voxel_grid.voxel_down_sample(pcd_1 + pcd_2).points)
+    intersection_size = len(pcd_1.points) + len(pcd_2.points) - united_size
+
+    coverage = calculate_point_cloud_coverage(pcds[i], pcds[j], voxel_grid)
+    iou = calculate_iou(pcds[i], pcds[j], voxel_grid)
+    assert coverage == intersection_size / len(pcd_1.points)
+    assert iou == intersection_size / united_size
+
+
+def test_batched_coverages():
+    rng = np.random.default_rng(0)
+    query = np.unique(rng.integers(0, 1000, 300))
+    candidates = [np.unique(rng.integers(0, 1000, size)) for size in [0, 1, 50, 700]]
+    coverages = calculate_voxels_coverages(query, candidates)
+    expected = [len(np.intersect1d(query, c)) / len(query) for c in candidates]
+    assert np.allclose(coverages, expected)
+    for candidate in candidates:
+        assert count_common_voxels(query, candidate) == len(
+            np.intersect1d(query, candidate)
+        )
+
+
+def test_empty_voxels():
+    """Empty frames are not covered and have zero IoU without warnings"""
+    empty = np.empty(0, dtype=np.int64)
+    voxels = np.arange(5, dtype=np.int64)
+    with np.errstate(all="raise"):
+        assert calculate_voxels_coverage(empty, voxels) == 0
+        assert calculate_voxels_coverage(empty, empty) == 0
+        assert calculate_voxels_coverage(voxels, empty) == 0
+        assert (calculate_voxels_coverages(empty, [voxels, empty]) == 0).all()
+        assert (calculate_voxels_coverages(voxels, [empty, empty]) == 0).all()
+        assert len(calculate_voxels_coverages(voxels, [])) == 0
+        assert calculate_voxels_iou(empty, empty) == 0
+        assert calculate_voxels_iou(empty, voxels) == 0
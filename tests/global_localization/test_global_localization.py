@@ -0,0 +1,195 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import pytest
+
+from vprdb.global_localization import GlobalLocalization
+
+
+class DescriptorsExtractor:
+    def __init__(self, descriptors):
+        self.descriptors = descriptors
+
+    def get_database_descriptors(self, database):
+        return self.descriptors[database]
+
+
+class LocalMatcher:
+    """Chooses the closest candidate by the same descriptors"""
+
+    def __init__(self, descriptors):
+        self.descriptors = descriptors
+        self.candidates_numbers = []
+
+    def get_database_features(self, database):
+        return self.descriptors[database]
+
+    def match_feature(self, query_feature, db_features):
+        self.candidates_numbers.append(len(db_features))
+        return ((db_features - query_feature) ** 2).sum(axis=-1).argmin()
+
+
+@pytest.fixture
+def extractor():
+    rng = np.random.default_rng(0)
+    return DescriptorsExtractor(rng.random((500, 32), dtype=np.float32))
+
+
+def exact_predictions(extractor, source_db, query_db):
+    source = extractor.descriptors[source_db]
+    queries = extractor.descriptors[query_db]
+    distances = ((queries[:, None] - source[None]) ** 2).sum(axis=-1)
+    return distances.argmin(axis=1).tolist()
+
+
+@pytest.mark.parametrize(
+    "index_factory, search_parameters",
+    [
+        ("Flat", {}),
+        ("IVF16,Flat", {"nprobe": 16}),
+        ("HNSW16", {"ef_search": 400}),
+    ],
+)
+def test_global_localization_index(extractor, index_factory, search_parameters):
+    source_db, query_db = np.arange(400), np.arange(400, 500)
+    global_localization = GlobalLocalization(
+        extractor,
+        source_db,
+        index_factory=index_factory,
+        train_size=200,
+        **search_parameters,
+    )
+    assert global_localization.predict(query_db) == exact_predictions(
+        extractor, source_db, query_db
+    )
+
+
+def test_global_localization_missing_neighbours(extractor):
+    """Candidates missing in the results of IVF index shouldn't be matched"""
+    source_db, query_db = np.arange(400), np.arange(400, 500)
+    local_matcher = LocalMatcher(extractor.descriptors)
+    global_localization = GlobalLocalization(
+        extractor,
+        source_db,
+        local_matcher=local_matcher,
+        index_factory="IVF64,Flat",
+        nprobe=1,
+    )
+    k_closest = 20
+    _, labels = global_localization.faiss_index.search(
+        extractor.descriptors[query_db], k_closest
+    )
+    assert (labels == -1).any()
+
+    predictions = global_localization.predict(query_db, k_closest=k_closest)
+    assert len(predictions) == len(query_db)
+    for prediction, query_labels in zip(predictions, labels):
+        assert prediction in query_labels[query_labels >= 0]
+    assert local_matcher.candidates_numbers == [
+        np.count_nonzero(query_labels >= 0) for query_labels in labels
+    ]
+
+
+def test_global_localization_no_neighbours(extractor):
+    global_localization = GlobalLocalization(
+        extractor, np.arange(400), index_factory="IVF16,Flat"
+    )
+    # Index without vectors returns only -1 labels
+    global_localization.faiss_index.reset()
+    with pytest.raises(ValueError):
+        global_localization.predict(np.arange(400, 500))
+
+
+@pytest.mark.parametrize(
+    "index_factory, min_train_size",
+    [
+        ("IVF16,Flat", 16),
+        ("PQ8", 256),
+        ("IVF4,PQ8x4", 16),
+        ("OPQ8,IVF4,Flat", 256),
+        ("PCA16,IVF4,Flat", 16),
+    ],
+)
+def test_global_localization_small_train_size(extractor, index_factory, min_train_size):
+    """Too small train size should be reported before training the index"""
+    with pytest.raises(ValueError):
+        GlobalLocalization(
+            extractor,
+            np.arange(400),
+            index_factory=index_factory,
+            train_size=min_train_size - 1,
+        )
+    GlobalLocalization(
+        extractor,
+        np.arange(400),
+        index_factory=index_factory,
+        train_size=min_train_size,
+    )
+    with pytest.raises(ValueError):
+        GlobalLocalization(
+            extractor, np.arange(min_train_size - 1), index_factory=index_factory
+        )
+
+
+def test_global_localization_saved_index(extractor, tmp_path):
+    source_db, query_db = np.arange(400), np.arange(400, 500)
+    path_to_index = tmp_path / "index.faiss"
+    index_parameters = dict(index_factory="OPQ8,IVF16,PQ8", train_size=300)
+    built = GlobalLocalization(
+        extractor, source_db, path_to_index=path_to_index, **index_parameters
+    )
+    assert path_to_index.exists()
+    loaded = GlobalLocalization(
+        extractor, source_db, path_to_index=path_to_index, **index_parameters
+    )
+    assert loaded.predict(query_db) == built.predict(query_db)
+
+    loaded.set_search_parameters(nprobe=16)
+    built.set_search_parameters(nprobe=16)
+    assert loaded.predict(query_db) == built.predict(query_db)
+
+
+@pytest.mark.parametrize(
+    "source_db, index_parameters",
+    [
+        # Other descriptors of the same size
+        (np.arange(100, 500), dict(index_factory="IVF16,Flat")),
+        (np.arange(300), dict(index_factory="IVF16,Flat")),
+        (np.arange(400), dict(index_factory="IVF8,Flat")),
+        (np.arange(400), dict(index_factory="IVF16,Flat", train_size=200)),
+    ],
+)
+def test_global_localization_mismatched_index(
+    extractor, tmp_path, source_db, index_parameters
+):
+    """Saved index should not be used for other descriptors or parameters"""
+    path_to_index = tmp_path / "index.faiss"
+    GlobalLocalization(
+        extractor,
+        np.arange(400),
+        index_factory="IVF16,Flat",
+        path_to_index=path_to_index,
+    )
+    with pytest.raises(ValueError):
+        GlobalLocalization(
+            extractor, source_db, path_to_index=path_to_index, **index_parameters
+        )
+
+
+def test_global_localization_index_without_parameters(extractor, tmp_path):
+    path_to_index = tmp_path / "index.faiss"
+    GlobalLocalization(extractor, np.arange(400), path_to_index=path_to_index)
+    (tmp_path / "index.faiss.json").unlink()
+    with pytest.raises(ValueError):
+        GlobalLocalization(extractor, np.arange(400), path_to_index=path_to_index)
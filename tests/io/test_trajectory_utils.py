@@ -0,0 +1,72 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import mrob
+import numpy as np
+
+from pathlib import Path
+
+from vprdb.io import read_trajectory, write_trajectory
+from vprdb.io.trajectory_utils import rotations_to_quaternions
+
+path_to_trajectory = Path("tests/test_db/poses.txt")
+
+
+def test_read_trajectory():
+    trajectory = read_trajectory(path_to_trajectory, with_timestamps=False)
+    poses_quat = np.loadtxt(path_to_trajectory)
+    assert trajectory.shape == (len(poses_quat), 4, 4)
+    assert trajectory.flags.c_contiguous
+    for pose, pose_quat in zip(trajectory, poses_quat):
+        assert np.allclose(pose[:3, :3], mrob.geometry.quat_to_so3(pose_quat[3:]))
+        assert (pose[:3, 3] == pose_quat[:3]).all()
+        assert (pose[3] == [0, 0, 0, 1]).all()
+
+
+def test_quaternions_match_mrob():
+    rng = np.random.default_rng(0)
+    quaternions = rng.normal(size=(1000, 4))
+    # Rotations by 180 degrees have zero trace and use different branches
+    quaternions[:100, 3] = 0
+    rotations = [mrob.geometry.quat_to_so3(quaternion) for quaternion in quaternions]
+    expected_quaternions = [
+        mrob.geometry.so3_to_quat(rotation) for rotation in rotations
+    ]
+    assert np.allclose(rotations_to_quaternions(rotations), expected_quaternions)
+
+
+def test_write_trajectory(tmp_path):
+    trajectory = read_trajectory(path_to_trajectory, with_timestamps=False)
+    write_trajectory(trajectory, tmp_path / "poses.txt")
+    written_trajectory = read_trajectory(tmp_path / "poses.txt", with_timestamps=False)
+    assert np.allclose(written_trajectory, trajectory, atol=1e-8)
+
+
+def test_write_trajectory_round_trip(tmp_path):
+    """Positions and quaternions should be read back exactly as they were written"""
+    rng = np.random.default_rng(0)
+    trajectory = np.tile(np.eye(4), (100, 1, 1))
+    trajectory[:, :3, :3] = [
+        mrob.geometry.quat_to_so3(quaternion)
+        for quaternion in rng.normal(size=(100, 4))
+    ]
+    trajectory[:, :3, 3] = rng.normal(scale=1e3, size=(100, 3))
+    write_trajectory(trajectory, tmp_path / "poses.txt")
+
+    written_poses_quat = np.loadtxt(tmp_path / "poses.txt")
+    assert (written_poses_quat[:, :3] == trajectory[:, :3, 3]).all()
+    assert (
+        written_poses_quat[:, 3:] == rotations_to_quaternions(trajectory[:, :3, :3])
+    ).all()
+    written_trajectory = read_trajectory(tmp_path / "poses.txt", with_timestamps=False)
+    assert (written_trajectory[:, :3, 3] == trajectory[:, :3, 3]).all()
@@ -15,10 +15,37 @@ import numpy as np
 import pytest
 
 from tests.test_data import real_db
-from tests.utils import generate_random_samples_of_test_db, get_db_subset
+from tests.utils import (
+    add_empty_frame,
+    generate_random_samples_of_test_db,
+    get_db_subset,
+)
+from vprdb.core import calculate_voxels_coverages, VoxelGrid
 from vprdb.metrics import frames_coverage
 
 
+# Values of the implementation based on Open3D down sampling of point clouds
+pre_series_coverages = [
+    ([0], [1.0, 0.0, 0.0, 0.0, 0.9619377162629758]),
+    ([1, 3], [0.0, 1.0, 0.11026615969581749, 1.0, 0.0]),
+    ([0, 2, 4], [1.0, 0.17791411042944785, 1.0, 0.0, 1.0]),
+    ([4, 3], [0.5852631578947368, 0.0, 0.0, 1.0, 1.0]),
+]
+
+
+def baseline_frames_coverage(original_db, reduced_db, anchor_at_origin):
+    if anchor_at_origin:
+        voxel_grid = VoxelGrid.from_origin(0.3)
+    else:
+        min_bounds, max_bounds = original_db.bounds
+        voxel_grid = VoxelGrid(min_bounds, max_bounds, 0.3)
+    reduced_voxels = reduced_db.get_voxel_keys(voxel_grid)
+    return [
+        float(calculate_voxels_coverages(query_voxels, reduced_voxels).max())
+        for query_voxels in original_db.get_voxel_keys(voxel_grid)
+    ]
+
+
 @pytest.mark.parametrize("indices", generate_random_samples_of_test_db(10))
 def test_frames_coverage_db_subset(indices):
     """
@@ -28,3 +55,44 @@ def test_frames_coverage_db_subset(indices):
     new_db = get_db_subset(real_db, indices)
     metric_result = frames_coverage(real_db, new_db)
     assert (np.asarray(metric_result)[indices] == 1).all()
+
+
+@pytest.mark.parametrize("indices", [[0], [1, 3], [0, 2, 4], [4, 3]])
+@pytest.mark.parametrize("num_of_pose_candidates", [0, 1, 3])
+@pytest.mark.parametrize("num_of_threads", [1, -1])
+@pytest.mark.parametrize("anchor_at_origin", [False, True])
+def test_frames_coverage_matches_baseline(
+    indices, num_of_pose_candidates, num_of_threads, anchor_at_origin
+):
+    new_db = get_db_subset(real_db, indices)
+    metric_result = frames_coverage(
+        real_db,
+        new_db,
+        num_of_threads=num_of_threads,
+        num_of_pose_candidates=num_of_pose_candidates,
+        anchor_at_origin=anchor_at_origin,
+    )
+    assert metric_result == pytest.approx(
+        baseline_frames_coverage(real_db, new_db, anchor_at_origin)
+    )
+
+
+@pytest.mark.parametrize("indices, expected_coverages", pre_series_coverages)
+def test_frames_coverage_matches_pre_series_values(indices, expected_coverages):
+    """By default, voxels are anchored at the scene bounds as before"""
+    new_db = get_db_subset(real_db, indices)
+    metric_result = frames_coverage(real_db, new_db, num_of_threads=1)
+    assert metric_result == pytest.approx(expected_coverages)
+
+
+def test_frames_coverage_empty_frame(tmp_path):
+    original_db = add_empty_frame(real_db, tmp_path)
+    metric_result = frames_coverage(original_db, get_db_subset(real_db, [0, 2]))
+    assert len(metric_result) == len(original_db)
+    assert metric_result[-1] == 0
+    assert np.isfinite(metric_result).all()
+
+
+def test_frames_coverage_wrong_pose_candidates():
+    with pytest.raises(ValueError):
+        frames_coverage(real_db, real_db, num_of_pose_candidates=-1)
@@ -36,3 +36,14 @@ def test_recall_db_subset(indices):
 def test_recall_best_case():
     metric_result = recall(real_db, real_db, list(range(len(real_db))))
     assert metric_result == 1
+
+
+@pytest.mark.parametrize(
+    "matches, threshold, expected_recall",
+    [([0, 0, 1, 2, 2], 0.5, 0.6), ([2, 1, 0, 0, 1], 0.3, 0.2)],
+)
+def test_recall_pre_series_values(matches, threshold, expected_recall):
+    """By default, voxels are anchored at the scene bounds as before"""
+    source_db = get_db_subset(real_db, [0, 2, 4])
+    metric_result = recall(source_db, real_db, matches, threshold=threshold)
+    assert metric_result == pytest.approx(expected_recall)
@@ -37,3 +37,23 @@ def test_spatial_coverage_ordering():
 
 def test_spatial_coverage_full():
     assert metric_results[-1] == 1
+
+
+def test_spatial_coverage_tiled():
+    """
+    Tiled mode keeps the properties of the metric and doesn't depend on tile sizes
+    """
+    tiled_results = []
+    for threshold in thresholds:
+        reduced_db = DominatingSet(threshold).reduce(real_db)
+        tiled_result = spatial_coverage(
+            real_db, reduced_db, tiled=True, tile_size=1.0, memory_limit=1 << 12
+        )
+        assert tiled_result == spatial_coverage(real_db, reduced_db, tiled=True)
+        tiled_results.append(tiled_result)
+    assert np.all(np.diff(tiled_results) > 0)
+    assert tiled_results[-1] == 1
+
+
+def test_spatial_coverage_down_sample_step():
+    assert spatial_coverage(real_db, real_db, down_sample_step=2) == 1
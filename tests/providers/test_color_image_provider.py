@@ -0,0 +1,41 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import cv2
+import numpy as np
+import pytest
+
+from tests.test_data import real_db
+from vprdb.providers import ColorImageProvider
+
+
+@pytest.mark.parametrize("size", [(1920, 1080), (960, 540), (640, 480), (200, 100)])
+def test_resized_jpeg(tmp_path, size: tuple[int, int]):
+    path = tmp_path / "image.jpg"
+    cv2.imwrite(str(path), real_db.color_images[0].color_image)
+    provider = ColorImageProvider(path)
+    image = provider.get_color_image(size)
+    assert image.shape == (size[1], size[0], 3)
+    expected_image = cv2.resize(
+        provider.color_image, size, interpolation=cv2.INTER_AREA
+    )
+    assert np.abs(image.astype(int) - expected_image).mean() < 3
+
+
+def test_grayscale_image():
+    provider = real_db.with_cache(1 << 30).color_images[0]
+    image = provider.get_color_image((640, 480), grayscale=True)
+    assert image.shape == (480, 640)
+    assert image is provider.get_color_image((640, 480), grayscale=True)
+    with pytest.raises(ValueError):
+        image[0, 0] = 0
@@ -0,0 +1,59 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import cv2
+import numpy as np
+import open3d as o3d
+import pytest
+
+from tests.test_data import real_db
+
+
+@pytest.mark.parametrize("stride", [1, 3])
+def test_points_match_open3d(stride):
+    provider = real_db.point_clouds[0]
+    depth_image = cv2.imread(str(provider.path), cv2.IMREAD_ANYDEPTH)
+    height, width = depth_image.shape
+    expected_point_cloud = o3d.geometry.PointCloud.create_from_depth_image(
+        o3d.geometry.Image(depth_image),
+        o3d.camera.PinholeCameraIntrinsic(width, height, provider.intrinsics),
+        depth_scale=provider.depth_scale,
+        depth_trunc=float("inf"),
+        stride=stride,
+    )
+    points = provider.get_points(stride)
+    assert points.dtype == np.float64
+    assert np.array_equal(points, np.asarray(expected_point_cloud.points))
+
+
+def test_max_points():
+    provider = real_db.point_clouds[0]
+    points = provider.get_points(max_points=10000)
+    assert 0 < len(points) <= 10000
+    with pytest.raises(ValueError):
+        provider.get_points(stride=0)
+
+
+def test_cached_points_are_read_only():
+    provider = real_db.with_cache(1 << 30).point_clouds[0]
+    points = provider.get_points(stride=2)
+    assert points is provider.get_points(stride=2)
+    with pytest.raises(ValueError):
+        points[0, 0] = 0
+
+
+def test_points_world_match_transformed_point_cloud():
+    provider = real_db.point_clouds[1]
+    pose = real_db.trajectory[1]
+    expected_points = np.asarray(provider.point_cloud.transform(pose).points)
+    assert np.allclose(provider.points_world(pose), expected_points, atol=1e-5)
@@ -0,0 +1,66 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import open3d as o3d
+import pytest
+
+from vprdb.providers import PointCloudProvider
+from vprdb.providers.pcd_reader import read_pcd_points
+
+
+def create_point_cloud() -> o3d.geometry.PointCloud:
+    rng = np.random.default_rng(0)
+    point_cloud = o3d.geometry.PointCloud(
+        o3d.utility.Vector3dVector(rng.uniform(-100, 100, (1000, 3)))
+    )
+    point_cloud.colors = o3d.utility.Vector3dVector(rng.uniform(0, 1, (1000, 3)))
+    point_cloud.normals = o3d.utility.Vector3dVector(rng.uniform(-1, 1, (1000, 3)))
+    return point_cloud
+
+
+@pytest.mark.parametrize(
+    "write_ascii, compressed", [(False, False), (True, False), (False, True)]
+)
+def test_points_match_open3d(tmp_path, write_ascii: bool, compressed: bool):
+    path = tmp_path / "point_cloud.pcd"
+    o3d.io.write_point_cloud(
+        str(path), create_point_cloud(), write_ascii=write_ascii, compressed=compressed
+    )
+    expected_points = np.asarray(o3d.io.read_point_cloud(str(path)).points)
+    points = PointCloudProvider(path).points
+    assert points.dtype == np.float32
+    assert (points == expected_points.astype(np.float32)).all()
+
+
+def test_binary_points_are_memory_mapped(tmp_path):
+    path = tmp_path / "point_cloud.pcd"
+    o3d.io.write_point_cloud(str(path), create_point_cloud())
+    points = read_pcd_points(path)
+    assert isinstance(points.base, np.memmap)
+    assert not points.flags.writeable
+
+
+def test_padded_fields(tmp_path):
+    points = np.arange(12, dtype=np.float32).reshape(4, 3)
+    records = np.zeros(
+        4, dtype=[("x", "<f4"), ("_", "<u1", (4,)), ("y", "<f4"), ("z", "<f4")]
+    )
+    records["x"], records["y"], records["z"] = points.T
+    header = (
+        "VERSION 0.7\nFIELDS x _ y z\nSIZE 4 1 4 4\nTYPE F U F F\nCOUNT 1 4 1 1\n"
+        "WIDTH 4\nHEIGHT 1\nVIEWPOINT 0 0 0 1 0 0 0\nPOINTS 4\nDATA binary\n"
+    )
+    path = tmp_path / "point_cloud.pcd"
+    path.write_bytes(header.encode("ascii") + records.tobytes())
+    assert (read_pcd_points(path) == points).all()
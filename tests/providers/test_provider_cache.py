@@ -0,0 +1,72 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import pickle
+import pytest
+
+from dataclasses import replace
+
+from tests.test_data import real_db
+from vprdb.providers import ProviderCache
+
+
+def test_cached_point_cloud_is_not_corrupted():
+    """Transformation of the returned point cloud should not affect the cache"""
+    cached_db = real_db.with_cache(1 << 30)
+    pcd_provider = cached_db.point_clouds[0]
+    expected_points = np.asarray(pcd_provider.point_cloud.points).copy()
+    pcd_provider.point_cloud.transform(real_db.trajectory[1])
+    assert (np.asarray(pcd_provider.point_cloud.points) == expected_points).all()
+    assert pcd_provider.cache.misses == 1
+    assert pcd_provider.cache.hits == 2
+
+
+def test_cached_color_image_is_read_only():
+    cached_db = real_db.with_cache(1 << 30)
+    image = cached_db.color_images[0].color_image
+    assert (image == real_db.color_images[0].color_image).all()
+    with pytest.raises(ValueError):
+        image[0, 0] = 0
+
+
+def test_cache_eviction():
+    cache = ProviderCache(max_bytes=100)
+    for key in range(5):
+        cache.get(key, lambda: np.zeros(40, dtype=np.uint8), lambda value: value.nbytes)
+    assert cache.current_bytes == 80
+    cache.get(0, lambda: np.zeros(40, dtype=np.uint8), lambda value: value.nbytes)
+    cache.get(4, lambda: np.zeros(40, dtype=np.uint8), lambda value: value.nbytes)
+    assert cache.misses == 6
+    assert cache.hits == 1
+    assert pickle.loads(pickle.dumps(cache)).current_bytes == 0
+
+
+def test_depth_images_with_different_calibration():
+    """Providers of the same depth image with different calibration share the cache"""
+    cache = ProviderCache(1 << 30)
+    depth_image = replace(real_db.point_clouds[0], cache=cache)
+    scaled_depth_image = replace(depth_image, depth_scale=depth_image.depth_scale * 2)
+    other_intrinsics = depth_image.intrinsics.copy()
+    other_intrinsics[0, 0] *= 2
+    other_depth_image = replace(depth_image, intrinsics=other_intrinsics)
+    for get_points in [
+        lambda provider: provider.points,
+        lambda provider: np.asarray(provider.point_cloud.points),
+    ]:
+        points = get_points(depth_image)
+        assert np.allclose(get_points(scaled_depth_image), points / 2)
+        assert not np.allclose(get_points(other_depth_image)[:, 0], points[:, 0])
+        assert np.array_equal(get_points(depth_image), points)
+    assert cache.misses == 6
+    assert cache.hits == 2
@@ -0,0 +1,88 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import itertools
+import networkx as nx
+import pytest
+
+from vprdb.reduction_methods.greedy_dominating_set import greedy_dominating_set
+
+graphs = [
+    nx.gnp_random_graph(num_nodes, probability, seed=seed)
+    for seed, (num_nodes, probability) in enumerate(
+        [(1, 0.5), (10, 0.0), (50, 0.05), (200, 0.02), (300, 0.1), (500, 0.01)]
+    )
+]
+
+
+@pytest.mark.parametrize("graph", graphs)
+@pytest.mark.parametrize("weighting", ["coverage", "degree"])
+def test_greedy_dominating_set(graph: nx.Graph, weighting: str):
+    """
+    The result should be a valid, sorted and reproducible dominating set
+    """
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=range(len(graph)))
+    result = greedy_dominating_set(adjacency, weighting)
+    assert nx.is_dominating_set(graph, result)
+    assert result == sorted(set(result))
+    assert greedy_dominating_set(adjacency, weighting) == result
+
+
+def find_minimum_dominating_set_size(graph: nx.Graph) -> int:
+    for size in range(1, len(graph) + 1):
+        for vertices in itertools.combinations(graph, size):
+            if nx.is_dominating_set(graph, vertices):
+                return size
+
+
+small_graphs = [
+    nx.gnp_random_graph(num_nodes, probability, seed=seed)
+    for seed, (num_nodes, probability) in enumerate(
+        [(6, 0.3), (8, 0.2), (10, 0.3), (12, 0.15), (12, 0.4)]
+    )
+]
+
+
+@pytest.mark.parametrize("graph", small_graphs)
+def test_greedy_dominating_set_approximation(graph: nx.Graph):
+    """
+    Greedy choice by coverage is within the factor H(max degree + 1)
+    of the minimum dominating set
+    """
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=range(len(graph)))
+    minimum_size = find_minimum_dominating_set_size(graph)
+    max_degree = max(degree for _, degree in graph.degree)
+    harmonic_number = sum(1 / i for i in range(1, max_degree + 2))
+    for weighting in ["coverage", "degree"]:
+        assert len(greedy_dominating_set(adjacency, weighting)) >= minimum_size
+    assert (
+        len(greedy_dominating_set(adjacency, "coverage"))
+        <= harmonic_number * minimum_size
+    )
+
+
+@pytest.mark.parametrize("weighting", ["coverage", "degree"])
+def test_greedy_dominating_set_known_optimum(weighting: str):
+    """
+    For disjoint stars and cliques the optimum is one vertex per component
+    """
+    components = [nx.star_graph(5), nx.complete_graph(4), nx.star_graph(2)]
+    graph = nx.disjoint_union_all(components + [nx.complete_graph(1)])
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=range(len(graph)))
+    assert len(greedy_dominating_set(adjacency, weighting)) == 4
+
+
+def test_unknown_weighting():
+    adjacency = nx.to_scipy_sparse_array(graphs[2])
+    with pytest.raises(ValueError):
+        greedy_dominating_set(adjacency, "random")
@@ -0,0 +1,85 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import pytest
+
+from tests.test_data import artificial_db_1, artificial_db_2, real_db
+from tests.utils import get_db_subset
+from vprdb.core import Database
+from vprdb.reduction_methods import (
+    CubeDivision,
+    DistanceVector,
+    DominatingSet,
+    EveryNth,
+)
+from vprdb.reduction_methods.reduction_method import ReductionMethod
+
+
+@pytest.mark.parametrize(
+    "input_db, method",
+    [
+        (artificial_db_1, EveryNth(2)),
+        (artificial_db_2, EveryNth(3)),
+        (artificial_db_1, DistanceVector(1.5)),
+        (artificial_db_2, DistanceVector(16.0)),
+        (real_db, DominatingSet(0.5, anchor_at_origin=True)),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 2, 5])
+def test_stream_matches_batch(
+    input_db: Database, method: ReductionMethod, chunk_size: int
+):
+    """Streaming reduction should give the same result as batch reduction"""
+    stream = method.create_stream()
+    decisions = []
+    for start in range(0, len(input_db), chunk_size):
+        indices = range(start, min(start + chunk_size, len(input_db)))
+        decisions.extend(stream.add_frames(get_db_subset(input_db, indices)))
+    streamed_db = stream.finalize()
+    batch_db = method.reduce(input_db)
+
+    assert len(decisions) == len(input_db)
+    assert [img.path for img in streamed_db.color_images] == [
+        img.path for img in batch_db.color_images
+    ]
+    streamed_positions = np.asarray(streamed_db.trajectory)[:, :3, 3]
+    batch_positions = np.asarray(batch_db.trajectory)[:, :3, 3]
+    assert (streamed_positions == batch_positions).all()
+    kept_decisions = [i for i, decision in enumerate(decisions) if decision]
+    assert all(decision is None for decision in decisions) or len(
+        kept_decisions
+    ) == len(batch_db)
+
+
+def test_cube_division_does_not_stream():
+    """CubeDivision depends on the whole trajectory, so it can't be streamed"""
+    with pytest.raises(NotImplementedError):
+        CubeDivision(16.0).create_stream()
+
+
+def test_dominating_set_stream_requires_origin_grid():
+    with pytest.raises(ValueError):
+        DominatingSet(0.5).create_stream()
+
+
+def test_dominating_set_stream_stores_voxel_keys():
+    """DominatingSet stream should keep only voxel keys of frames until finalization"""
+    stream = DominatingSet(0.5, anchor_at_origin=True).create_stream()
+    decisions = stream.add_frames(real_db)
+    assert decisions == [None] * len(real_db)
+    assert len(stream.frames_voxels) == len(real_db)
+    for frame_voxels, db_voxels in zip(
+        stream.frames_voxels, real_db.get_voxel_keys(stream.voxel_grid)
+    ):
+        assert (frame_voxels == db_voxels).all()
@@ -11,12 +11,15 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import cv2
 import numpy as np
 import random
 
 from nptyping import Float, NDArray, Shape
+from pathlib import Path
 
 from vprdb.core import Database
+from vprdb.providers import DepthImageProvider
 
 
 def generate_trajectory_from_positions(
@@ -24,7 +27,7 @@ def generate_trajectory_from_positions(
 ) -> list[NDArray[Shape["4, 4"], Float]]:
     poses = []
     for xyz in xyz_positions:
-        pose = np.empty((4, 4))
+        pose = np.eye(4)
         pose[:3, 3] = xyz
         poses.append(np.asarray(pose))
     return poses
@@ -43,3 +46,19 @@ def generate_random_samples_of_test_db(number_of_samples: int):
         sorted(random.sample(range(5), k=random.randint(1, 5)))
         for _ in range(number_of_samples)
     ]
+
+
+def add_empty_frame(database: Database, path_to_dir: Path) -> Database:
+    """Appends a frame with a depth image without valid points to the database"""
+    depth_image = database.point_clouds[0]
+    empty_depth = np.zeros_like(cv2.imread(str(depth_image.path), cv2.IMREAD_ANYDEPTH))
+    path_to_empty_depth = path_to_dir / "empty_depth.png"
+    cv2.imwrite(str(path_to_empty_depth), empty_depth)
+    empty_depth_image = DepthImageProvider(
+        path_to_empty_depth, depth_image.intrinsics, depth_image.depth_scale
+    )
+    return Database(
+        list(database.color_images) + [database.color_images[0]],
+        list(database.point_clouds) + [empty_depth_image],
+        list(database.trajectory) + [database.trajectory[0]],
+    )
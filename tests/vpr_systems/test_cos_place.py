@@ -0,0 +1,113 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from tests.test_data import real_db
+from vprdb.core import Database
+from vprdb.providers import ColorImageProvider
+from vprdb.vpr_systems import CosPlace
+from vprdb.vpr_systems.cos_place.model import network
+
+
+@pytest.fixture
+def path_to_weights(tmp_path, monkeypatch):
+    """Weights of CosPlace with a small backbone instead of the pretrained one"""
+    monkeypatch.setattr(
+        network,
+        "get_backbone",
+        lambda backbone_name: (torch.nn.Conv2d(3, 8, 8, stride=8), 8),
+    )
+    torch.manual_seed(0)
+    path_to_weights = tmp_path / "weights.pth"
+    torch.save(network.GeoLocalizationNet("resnet18", 4).state_dict(), path_to_weights)
+    return path_to_weights
+
+
+@pytest.fixture
+def mixed_sizes_db(tmp_path):
+    """Database with color images of two different resolutions"""
+    color_images = []
+    for i, color_image in enumerate(real_db.color_images):
+        image = color_image.color_image
+        if i % 2 == 1:
+            image = cv2.resize(image, (image.shape[1] // 2, image.shape[0] // 2))
+        path_to_image = tmp_path / f"color_{i}.png"
+        cv2.imwrite(str(path_to_image), image)
+        color_images.append(ColorImageProvider(path_to_image))
+    return Database(color_images, real_db.point_clouds, real_db.trajectory)
+
+
+def describe_one_by_one(cos_place, database):
+    return np.concatenate(
+        [
+            cos_place.get_database_descriptors(
+                database.subset([i]), batch_size=1, num_workers=0
+            )
+            for i in range(len(database))
+        ]
+    )
+
+
+@pytest.mark.parametrize("batch_size", [2, 16])
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_batched_descriptors_of_mixed_sizes(
+    path_to_weights, mixed_sizes_db, batch_size, num_workers
+):
+    """Images of different sizes should be batched without changing descriptors"""
+    cos_place = CosPlace("resnet18", 4, path_to_weights)
+    descriptors = cos_place.get_database_descriptors(
+        mixed_sizes_db, batch_size=batch_size, num_workers=num_workers
+    )
+    expected_descriptors = describe_one_by_one(cos_place, mixed_sizes_db)
+    assert np.allclose(descriptors, expected_descriptors, atol=1e-6)
+
+
+def test_batched_descriptors_with_resize(path_to_weights, mixed_sizes_db):
+    cos_place = CosPlace("resnet18", 4, path_to_weights, resize=(120, 160))
+    descriptors = cos_place.get_database_descriptors(mixed_sizes_db, batch_size=3)
+    expected_descriptors = describe_one_by_one(cos_place, mixed_sizes_db)
+    assert np.allclose(descriptors, expected_descriptors, atol=1e-6)
+
+
+def test_descriptor_store_after_loading_weights(path_to_weights, tmp_path):
+    """Descriptors stored for the previous weights should not be reused"""
+    path_to_store = tmp_path / "store"
+    cos_place = CosPlace(
+        "resnet18", 4, path_to_weights, path_to_descriptor_store=path_to_store
+    )
+    old_descriptors = cos_place.get_database_descriptors(real_db, num_workers=0)
+
+    path_to_new_weights = tmp_path / "new_weights.pth"
+    state_dict = cos_place.model.state_dict()
+    # Negated last linear layer negates normalized descriptors
+    for name in ["aggregation.3.weight", "aggregation.3.bias"]:
+        state_dict[name] = -state_dict[name]
+    torch.save(state_dict, path_to_new_weights)
+    cos_place.load_weights(path_to_new_weights)
+    new_descriptors = cos_place.get_database_descriptors(real_db, num_workers=0)
+
+    assert np.allclose(new_descriptors, -old_descriptors, atol=1e-6)
+    expected_descriptors = CosPlace(
+        "resnet18", 4, path_to_new_weights
+    ).get_database_descriptors(real_db, num_workers=0)
+    assert np.allclose(new_descriptors, expected_descriptors, atol=1e-6)
+    # Descriptors of the original weights are still stored
+    cos_place.load_weights(path_to_weights)
+    assert len(cos_place.descriptor_store) == len(real_db)
+    assert np.array_equal(
+        cos_place.get_database_descriptors(real_db, num_workers=0), old_descriptors
+    )
@@ -0,0 +1,98 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import os
+import pytest
+
+from vprdb.vpr_systems import DescriptorStore
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"{i}.png"
+        path.write_bytes(bytes([i]))
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / "weights.pth"
+    path.write_bytes(b"weights")
+    return path
+
+
+def describe(images):
+    return np.asarray(
+        [[int(image.stem), os.stat(image).st_mtime_ns % 1000, 1] for image in images],
+        dtype=np.float32,
+    )
+
+
+def test_descriptor_store(tmp_path, images, weights):
+    calls = []
+
+    def counting_describe(images_to_describe):
+        calls.append(len(images_to_describe))
+        return describe(images_to_describe)
+
+    store = DescriptorStore(tmp_path / "store", weights, {"resize": [480, 640]})
+    assert np.array_equal(
+        store.get_descriptors(images[:3], counting_describe), describe(images[:3])
+    )
+
+    # Reopened store describes only new and changed images
+    os.utime(images[1], ns=(0, 0))
+    store = DescriptorStore(tmp_path / "store", weights, {"resize": [480, 640]})
+    assert len(store) == 3
+    assert np.array_equal(
+        store.get_descriptors(images, counting_describe), describe(images)
+    )
+    assert calls == [3, 3]
+    assert len(store.descriptors) == 6
+
+    # Other preprocessing or weights use separate descriptors
+    other_store = DescriptorStore(tmp_path / "store", weights, {"resize": [240, 320]})
+    assert len(other_store) == 0
+    weights.write_bytes(b"other weights")
+    other_store = DescriptorStore(tmp_path / "store", weights, {"resize": [480, 640]})
+    assert len(other_store) == 0
+
+
+def test_descriptor_store_interrupted_write(tmp_path, images, weights):
+    store = DescriptorStore(tmp_path, weights, {})
+    store.add(images[:2], describe(images[:2]))
+    # Simulate rows written without the index and a broken index line
+    with open(store.path / "descriptors.f32", "ab") as descriptors_file:
+        descriptors_file.write(b"\0" * 14)
+    with open(store.path / "index.jsonl", "a") as index_file:
+        index_file.write('["broken')
+
+    store = DescriptorStore(tmp_path, weights, {})
+    assert len(store) == 2
+    store.add(images[2:], describe(images[2:]))
+    store = DescriptorStore(tmp_path, weights, {})
+    assert np.array_equal(store.descriptors, describe(images))
+    assert np.array_equal(store.find(images), np.arange(5))
+
+
+def test_descriptor_store_wrong_size(tmp_path, images, weights):
+    store = DescriptorStore(tmp_path, weights, {})
+    store.add(images[:1], describe(images[:1]))
+    with pytest.raises(ValueError):
+        store.add(images[1:2], np.zeros((1, 4), dtype=np.float32))
+    with pytest.raises(ValueError):
+        store.add(images[1:3], describe(images[1:2]))
@@ -0,0 +1,52 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import pytest
+import torch
+import torch.nn.functional as F
+
+from vprdb.vpr_systems.netvlad.model.layer import NetVLADModule
+
+
+def looped_netvlad(layer, x):
+    N, C = x.shape[:2]
+    x = F.normalize(x, p=2, dim=1)
+    soft_assign = F.softmax(layer.conv(x).view(N, layer.num_clusters, -1), dim=1)
+    x_flatten = x.view(N, C, -1)
+    vlad = torch.zeros([N, layer.num_clusters, C], dtype=x.dtype)
+    for cluster in range(layer.num_clusters):
+        residual = x_flatten.unsqueeze(0).permute(1, 0, 2, 3) - layer.centroids[
+            cluster : cluster + 1, :
+        ].expand(x_flatten.size(-1), -1, -1).permute(1, 2, 0).unsqueeze(0)
+        residual *= soft_assign[:, cluster : cluster + 1, :].unsqueeze(2)
+        vlad[:, cluster : cluster + 1, :] = residual.sum(dim=-1)
+    vlad = F.normalize(vlad, p=2, dim=2)
+    vlad = vlad.view(x.size(0), -1)
+    return F.normalize(vlad, p=2, dim=1)
+
+
+@pytest.mark.parametrize("cluster_chunk_size", [None, 1, 5, 16])
+@pytest.mark.parametrize("vladv2", [False, True])
+def test_netvlad_aggregation(cluster_chunk_size, vladv2):
+    torch.manual_seed(0)
+    layer = NetVLADModule(
+        num_clusters=16, dim=32, vladv2=vladv2, cluster_chunk_size=cluster_chunk_size
+    )
+    x = torch.rand(3, 32, 6, 7)
+    with torch.no_grad():
+        assert torch.allclose(layer(x), looped_netvlad(layer, x), atol=1e-6)
+
+
+def test_netvlad_wrong_chunk_size():
+    with pytest.raises(ValueError):
+        NetVLADModule(num_clusters=16, dim=32, cluster_chunk_size=0)
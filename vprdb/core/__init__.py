@@ -16,12 +16,24 @@
 color images, depth images and trajectory and their further use for the VPR task.
 
 `VoxelGrid` and `utils` provide various operations on point clouds.
+`VoxelFramesIndex` and `calculate_overlap_matrix` allow to quickly find frames
+that overlap with each other.
+`TiledVoxelMap` stores the map of large scenes out of RAM.
+`PackedDatabase` keeps the DB with precomputed data in memory-mappable files.
 """
 from vprdb.core.database import Database
 from vprdb.core.utils import (
     calculate_iou,
     calculate_point_cloud_coverage,
+    calculate_voxels_coverage,
+    calculate_voxels_coverages,
+    calculate_voxels_iou,
+    count_common_voxels,
     find_bounds_for_multiple_databases,
     match_two_databases,
 )
+from vprdb.core.frame import Frame
+from vprdb.core.packed_database import PackedDatabase
+from vprdb.core.tiled_voxel_map import TiledVoxelMap
+from vprdb.core.voxel_frames_index import calculate_overlap_matrix, VoxelFramesIndex
 from vprdb.core.voxel_grid import VoxelGrid
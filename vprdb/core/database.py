@@ -14,13 +14,28 @@
 import numpy as np
 import open3d as o3d
 
-from dataclasses import dataclass
-from functools import cached_property
-from nptyping import Float, NDArray, Shape
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from nptyping import Float, Int64, NDArray, Shape
 from pathlib import Path
+from scipy import sparse
+from typing import Optional
 
+from vprdb.core.frame import Frame, FRAME_FIELDS
+from vprdb.core.packed_database import PackedDatabase
+from vprdb.core.providers_sequences import ProvidersView
+from vprdb.core.tiled_voxel_map import TiledVoxelMap
+from vprdb.core.voxel_frames_index import calculate_overlap_matrix
 from vprdb.core.voxel_grid import VoxelGrid
-from vprdb.providers import ColorImageProvider, DepthImageProvider, PointCloudProvider
+from vprdb.providers import (
+    ColorImageProvider,
+    DepthImageProvider,
+    PointCloudProvider,
+    ProviderCache,
+)
+from vprdb.providers.utils import transform_points
 
 
 @dataclass(frozen=True)
@@ -30,12 +45,33 @@ class Database:
     and trajectory and their further use for the VPR task
     """
 
-    color_images: list[ColorImageProvider]
-    point_clouds: list[DepthImageProvider | PointCloudProvider]
-    trajectory: list[NDArray[Shape["4, 4"], Float]]
+    color_images: Sequence[ColorImageProvider]
+    point_clouds: Sequence[DepthImageProvider | PointCloudProvider]
+    trajectory: NDArray[Shape["*, 4, 4"], Float]
+    """Camera poses. List of poses is converted into one array on construction"""
+    _voxel_keys_cache: dict = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _packed: Optional[PackedDatabase] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _base: Optional["Database"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _indices: Optional[NDArray[Shape["*"], Int64]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _bounds_cache: Optional[
+        tuple[NDArray[Shape["3"], Float], NDArray[Shape["3"], Float]]
+    ] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        if not (len(self.trajectory) == len(self.point_clouds) == len(self.trajectory)):
+        # Memory-mapped trajectories are not copied
+        trajectory = np.asarray(self.trajectory, dtype=np.float64).reshape(-1, 4, 4)
+        object.__setattr__(self, "trajectory", trajectory)
+        if not (
+            len(self.trajectory) == len(self.point_clouds) == len(self.color_images)
+        ):
             raise ValueError(
                 "Trajectory, RGB images and point clouds should have equal length"
             )
@@ -89,28 +125,213 @@ class Database:
         ]
         return cls(color_images_providers, point_clouds_providers, trajectory)
 
+    @classmethod
+    def open_packed(cls, path_to_packed: Path):
+        """
+        Opens the database packed with the save_packed method.
+        Only the manifest is read, the frames and other data are loaded on access.
+        Voxel keys and bounds are taken from the packed database if possible
+        :param path_to_packed: Directory of the packed database
+        :return: Opened database
+        """
+        packed = PackedDatabase(path_to_packed)
+        database = cls(packed.color_images, packed.point_clouds, packed.trajectory)
+        object.__setattr__(database, "_packed", packed)
+        return database
+
+    def save_packed(
+        self,
+        path_to_packed: Path,
+        voxel_grids: Optional[list[VoxelGrid]] = None,
+        global_descriptors: Optional[dict[str, NDArray[Shape["*, *"], Float]]] = None,
+        local_descriptors: Optional[
+            dict[str, list[NDArray[Shape["*, *"], Float]]]
+        ] = None,
+    ):
+        """
+        Packs the database into a directory of memory-mappable arrays,
+        so it can be quickly opened with the open_packed method.
+        Files of the frames are not copied, the packed database refers to them
+        :param path_to_packed: Directory for the packed database.
+        Will be created if it does not exist
+        :param voxel_grids: Voxel grids for calculating voxel keys of the frames
+        :param global_descriptors: Global descriptors of the frames by their names
+        :param local_descriptors: Local descriptors of the frames by their names
+        """
+        PackedDatabase.write(
+            self, path_to_packed, voxel_grids, global_descriptors, local_descriptors
+        )
+
+    @property
+    def packed(self) -> Optional[PackedDatabase]:
+        """Packed database the DB was opened from"""
+        return self._packed
+
     def __len__(self):
         return len(self.trajectory)
 
-    @cached_property
+    def subset(self, indices: NDArray[Shape["*"], Int64] | list[int]) -> "Database":
+        """
+        Creates a view of the DB containing only the given frames.
+        Providers are not copied, and subsets of views refer to the original DB,
+        so the cost depends only on the number of selected frames.
+        Voxel keys already calculated for the original DB are reused
+        :param indices: Indices of the selected frames
+        :return: Database view
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if len(indices) > 0 and (
+            indices.min() < -len(self) or indices.max() >= len(self)
+        ):
+            raise IndexError("Frame index is out of range")
+        indices = np.where(indices < 0, indices + len(self), indices)
+        base = self if self._base is None else self._base
+        base_indices = indices if self._base is None else self._indices[indices]
+        view = Database(
+            ProvidersView(base.color_images, base_indices),
+            ProvidersView(base.point_clouds, base_indices),
+            base.trajectory[base_indices],
+        )
+        object.__setattr__(view, "_base", base)
+        object.__setattr__(view, "_indices", base_indices)
+        return view
+
+    def iter_frames(
+        self,
+        prefetch: int = 8,
+        workers: int = 4,
+        fields: tuple[str, ...] = ("color_image", "point_cloud"),
+        image_size: Optional[tuple[int, int]] = None,
+    ) -> Iterator[Frame]:
+        """
+        Iterates over frames of the DB. Frames are loaded ahead in the background
+        thread pool, so reading and decoding overlap with processing of the previous frames
+        :param prefetch: Maximum number of frames loaded ahead
+        :param workers: Number of loading threads. If zero, frames are loaded
+        in the calling thread
+        :param fields: Data to be loaded for each frame: "color_image", "point_cloud",
+        "points" (in the camera coordinate system) and "points_world"
+        :param image_size: Size of color images as (width, height).
+        Images are decoded at reduced resolution if possible
+        :return: Iterator over frames in the order of the DB
+        """
+        for field_name in fields:
+            if field_name not in FRAME_FIELDS:
+                raise ValueError("Unknown frame field: " + field_name)
+        if prefetch < 1:
+            raise ValueError("Prefetch must be positive")
+        if workers < 0:
+            raise ValueError("Number of workers must be non-negative")
+        return self.__iter_frames(prefetch, workers, fields, image_size)
+
+    def __iter_frames(
+        self,
+        prefetch: int,
+        workers: int,
+        fields: tuple[str, ...],
+        image_size: Optional[tuple[int, int]],
+    ) -> Iterator[Frame]:
+        if workers == 0:
+            for i in range(len(self)):
+                yield self.__load_frame(i, fields, image_size)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending_frames = deque()
+            next_index = 0
+            while next_index < len(self) or len(pending_frames) > 0:
+                while next_index < len(self) and len(pending_frames) < prefetch:
+                    pending_frames.append(
+                        executor.submit(
+                            self.__load_frame, next_index, fields, image_size
+                        )
+                    )
+                    next_index += 1
+                yield pending_frames.popleft().result()
+        finally:
+            # Frames which are not needed anymore are not loaded
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __load_frame(
+        self,
+        index: int,
+        fields: tuple[str, ...],
+        image_size: Optional[tuple[int, int]],
+    ) -> Frame:
+        pose = self.trajectory[index]
+        data = dict()
+        if "color_image" in fields:
+            data["color_image"] = self.color_images[index].get_color_image(image_size)
+        if "point_cloud" in fields:
+            data["point_cloud"] = self.point_clouds[index].point_cloud
+        if "points" in fields or "points_world" in fields:
+            points = self.point_clouds[index].points
+            if "points" in fields:
+                data["points"] = points
+            if "points_world" in fields:
+                data["points_world"] = transform_points(points, pose)
+        return Frame(index, pose, **data)
+
+    def with_cache(self, max_bytes: int) -> "Database":
+        """
+        Creates the same database with providers sharing the cache of loaded data.
+        Useful when the same frames are accessed many times
+        :param max_bytes: Maximum total size of the cached data in bytes
+        :return: Database with cached providers
+        """
+        cache = ProviderCache(max_bytes)
+        color_images = [replace(image, cache=cache) for image in self.color_images]
+        point_clouds = [replace(pcd, cache=cache) for pcd in self.point_clouds]
+        cached_database = Database(color_images, point_clouds, self.trajectory)
+        object.__setattr__(cached_database, "_packed", self._packed)
+        return cached_database
+
+    @property
     def bounds(
         self,
     ) -> tuple[NDArray[Shape["3"], Float], NDArray[Shape["3"], Float]]:
         """
-        Gets bounds of the DB scene
+        Gets bounds of the DB scene. They are calculated only once
         :return: Min and max bounds of the scene
         """
+        if self._bounds_cache is None:
+            object.__setattr__(self, "_bounds_cache", self.__calculate_bounds())
+        return self._bounds_cache
+
+    def __calculate_bounds(
+        self,
+    ) -> tuple[NDArray[Shape["3"], Float], NDArray[Shape["3"], Float]]:
+        base = self if self._base is None else self._base
+        if base._packed is not None:
+            aabbs = np.asarray(base._packed.aabbs)
+            if self._base is not None:
+                aabbs = aabbs[self._indices]
+            # Frames without valid points have inverted infinite boxes
+            aabbs = aabbs[(aabbs[:, 0] <= aabbs[:, 1]).all(axis=1)]
+            return Database.__merge_bounds(list(aabbs[:, 0]), list(aabbs[:, 1]))
+
         min_bounds = []
         max_bounds = []
+        for frame in self.iter_frames(fields=("points_world",)):
+            # Frames without valid points don't affect the bounds
+            if len(frame.points_world) > 0:
+                min_bounds.append(frame.points_world.min(axis=0))
+                max_bounds.append(frame.points_world.max(axis=0))
+        return Database.__merge_bounds(min_bounds, max_bounds)
 
-        for i in range(len(self)):
-            pcd = self.point_clouds[i].point_cloud.transform(self.trajectory[i])
-            min_bounds.append(pcd.get_min_bound())
-            max_bounds.append(pcd.get_max_bound())
-
-        min_bound = np.amin(np.asarray(min_bounds), axis=0)
-        max_bound = np.amax(np.asarray(max_bounds), axis=0)
-        return min_bound, max_bound
+    @staticmethod
+    def __merge_bounds(
+        min_bounds: list[NDArray[Shape["3"], Float]],
+        max_bounds: list[NDArray[Shape["3"], Float]],
+    ) -> tuple[NDArray[Shape["3"], Float], NDArray[Shape["3"], Float]]:
+        # Empty scene has zero bounds as in Open3D
+        if len(min_bounds) == 0:
+            return np.zeros(3), np.zeros(3)
+        return (
+            np.amin(np.asarray(min_bounds), axis=0),
+            np.amax(np.asarray(max_bounds), axis=0),
+        )
 
     def build_sparse_map(
         self,
@@ -124,9 +345,105 @@ class Database:
         :return: Resulting point cloud of the scene
         """
         map_pcd = o3d.geometry.PointCloud()
-        for i, (pose, pcd_raw) in enumerate(zip(self.trajectory, self.point_clouds)):
-            pcd = pcd_raw.point_cloud.transform(pose)
-            map_pcd += pcd
-            if i % down_sample_step == 0:
+        for frame in self.iter_frames(fields=("point_cloud",)):
+            map_pcd += frame.point_cloud.transform(frame.pose)
+            if frame.index % down_sample_step == 0:
                 map_pcd = voxel_grid.voxel_down_sample(map_pcd)
         return voxel_grid.voxel_down_sample(map_pcd)
+
+    def build_voxel_map(
+        self,
+        voxel_grid: VoxelGrid,
+        tile_size: float = 100.0,
+        memory_limit: int = 1 << 30,
+        path_to_tiles: Optional[Path] = None,
+    ) -> TiledVoxelMap:
+        """
+        Builds map of the whole DB scene as a set of occupied voxels.
+        Frames are streamed into spatial tiles which are flushed to the hard drive
+        when the memory limit is exceeded. Bounds of the scene are calculated
+        in the same pass, so the following access to them is free
+        :param voxel_grid: Voxel grid for voxelization
+        :param tile_size: Size of the tiles along the X axis
+        :param memory_limit: Maximum size of voxel keys kept in RAM in bytes
+        :param path_to_tiles: Directory for flushed tiles.
+        If not given, a temporary directory is used
+        :return: Tiled map of the scene
+        """
+        tile_voxels = max(1, int(tile_size / voxel_grid.voxel_size))
+        voxel_map = TiledVoxelMap(tile_voxels, memory_limit, path_to_tiles)
+        min_bounds = []
+        max_bounds = []
+        for frame in self.iter_frames(fields=("points_world",)):
+            if len(frame.points_world) > 0:
+                min_bounds.append(frame.points_world.min(axis=0))
+                max_bounds.append(frame.points_world.max(axis=0))
+            voxel_map.add(voxel_grid.get_occupied_voxels(frame.points_world))
+
+        if self._bounds_cache is None and len(self) > 0:
+            bounds = Database.__merge_bounds(min_bounds, max_bounds)
+            object.__setattr__(self, "_bounds_cache", bounds)
+        return voxel_map
+
+    def get_voxel_keys(self, voxel_grid: VoxelGrid) -> list[NDArray[Shape["*"], Int64]]:
+        """
+        Gets voxels occupied by each frame of the DB.
+        Point clouds are read and voxelized only once for each voxel grid,
+        subsequent calls return cached results.
+        Keys stored in the packed database or calculated for the original DB of the view
+        are not recalculated
+        :param voxel_grid: Voxel grid for voxelization
+        :return: List of sorted voxel keys for each frame
+        """
+        cache_key = (voxel_grid.voxel_size, *np.asarray(voxel_grid.min_bounds).tolist())
+        if cache_key not in self._voxel_keys_cache:
+            known_voxel_keys = None
+            if self._base is not None:
+                base_voxel_keys = self._base.__get_known_voxel_keys(voxel_grid)
+                if base_voxel_keys is not None:
+                    known_voxel_keys = [base_voxel_keys[i] for i in self._indices]
+            else:
+                known_voxel_keys = self.__get_known_voxel_keys(voxel_grid)
+            if known_voxel_keys is not None:
+                self._voxel_keys_cache[cache_key] = known_voxel_keys
+        if cache_key not in self._voxel_keys_cache:
+            self._voxel_keys_cache[cache_key] = [
+                voxel_grid.get_occupied_voxels(frame.points_world)
+                for frame in self.iter_frames(fields=("points_world",))
+            ]
+        return self._voxel_keys_cache[cache_key]
+
+    def __get_known_voxel_keys(
+        self, voxel_grid: VoxelGrid
+    ) -> Optional[list[NDArray[Shape["*"], Int64]]]:
+        # Voxel keys which don't require reading point clouds
+        cache_key = (voxel_grid.voxel_size, *np.asarray(voxel_grid.min_bounds).tolist())
+        if cache_key in self._voxel_keys_cache:
+            return self._voxel_keys_cache[cache_key]
+        if self._packed is not None:
+            packed_voxel_keys = self._packed.get_voxel_keys(voxel_grid)
+            if packed_voxel_keys is not None:
+                self._voxel_keys_cache[cache_key] = packed_voxel_keys
+            return packed_voxel_keys
+        return None
+
+    def overlap_matrix(
+        self, voxel_grid: VoxelGrid, other_db: Optional["Database"] = None
+    ) -> tuple[
+        sparse.csr_matrix, NDArray[Shape["*"], Int64], NDArray[Shape["*"], Int64]
+    ]:
+        """
+        Calculates the number of voxels shared by every pair of frames.
+        The matrix is obtained as a product of sparse frames × voxels incidence matrices,
+        so only the pairs of overlapping frames are stored
+        :param voxel_grid: Voxel grid for voxelization
+        :param other_db: Database to be compared with. If not given,
+        frames of the DB are compared with each other
+        :return: Sparse matrix where (i, j) element is the number of voxels shared by
+        the i-th frame of the DB and the j-th frame of the other DB,
+        numbers of voxels in frames of the DB and numbers of voxels in frames of the other DB
+        """
+        return calculate_overlap_matrix(
+            self.get_voxel_keys(voxel_grid),
+            None if other_db is None else other_db.get_voxel_keys(voxel_grid),
+        )
@@ -0,0 +1,38 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import open3d as o3d
+
+from dataclasses import dataclass
+from nptyping import Float, Float64, NDArray, Shape, UInt8
+from typing import Optional
+
+FRAME_FIELDS = ("color_image", "point_cloud", "points", "points_world")
+
+
+@dataclass(frozen=True)
+class Frame:
+    """Frame of the DB with the data loaded by Database.iter_frames"""
+
+    index: int
+    """Index of the frame in the DB"""
+    pose: NDArray[Shape["4, 4"], Float]
+    """Pose of the frame"""
+    color_image: Optional[NDArray[Shape["*, *, 3"], UInt8]] = None
+    """Color image in OpenCV format"""
+    point_cloud: Optional[o3d.geometry.PointCloud] = None
+    """Open3D point cloud in the camera coordinate system"""
+    points: Optional[NDArray[Shape["*, 3"], Float]] = None
+    """Points in the camera coordinate system"""
+    points_world: Optional[NDArray[Shape["*, 3"], Float64]] = None
+    """Points in the world coordinate system"""
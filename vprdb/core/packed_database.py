@@ -0,0 +1,270 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import json
+import numpy as np
+import os
+
+from functools import cached_property
+from nptyping import Float, Int64, NDArray, Shape
+from pathlib import Path
+from typing import Optional
+
+from vprdb.core.providers_sequences import LazyProviders
+from vprdb.core.voxel_grid import VoxelGrid
+from vprdb.providers import ColorImageProvider, DepthImageProvider, PointCloudProvider
+
+MANIFEST_FILE_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+class PackedDatabase:
+    """
+    Database packed into a directory with a manifest and NumPy arrays.
+    Arrays are memory-mapped, so opening the database doesn't depend on its size.
+    Besides paths to the frames and the trajectory, the directory keeps
+    axis-aligned bounding boxes of the frames, voxel keys for the chosen voxel grids
+    and optional descriptors
+    """
+
+    def __init__(self, path: Path):
+        """
+        Opens packed database
+        :param path: Path to the directory of the packed database
+        """
+        self.path = path
+        with open(path / MANIFEST_FILE_NAME, "r") as manifest_file:
+            self.manifest = json.load(manifest_file)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported version of packed database: "
+                + str(self.manifest.get("format_version"))
+            )
+
+    def __len__(self):
+        return self.manifest["num_frames"]
+
+    def __load(self, file_name: str) -> np.ndarray:
+        return np.load(self.path / file_name, mmap_mode="r")
+
+    @cached_property
+    def trajectory(self) -> NDArray[Shape["*, 4, 4"], Float]:
+        """Memory-mapped camera poses"""
+        return self.__load("trajectory.npy")
+
+    @cached_property
+    def aabbs(self) -> NDArray[Shape["*, 2, 3"], Float]:
+        """Memory-mapped min and max bounds of each frame in the world coordinates"""
+        return self.__load("aabbs.npy")
+
+    @cached_property
+    def color_images(self) -> LazyProviders:
+        """Color images providers"""
+        paths = self.__load("color_images.npy")
+        return LazyProviders(
+            lambda i: ColorImageProvider(self.path / str(paths[i])), len(self)
+        )
+
+    @cached_property
+    def point_clouds(self) -> LazyProviders:
+        """Depth images or point clouds providers"""
+        paths = self.__load("point_clouds.npy")
+        point_clouds_info = self.manifest["point_clouds"]
+        if point_clouds_info["type"] == "depth":
+            intrinsics = np.asarray(point_clouds_info["intrinsics"])
+            depth_scale = point_clouds_info["depth_scale"]
+            return LazyProviders(
+                lambda i: DepthImageProvider(
+                    self.path / str(paths[i]), intrinsics, depth_scale
+                ),
+                len(self),
+            )
+        return LazyProviders(
+            lambda i: PointCloudProvider(self.path / str(paths[i])), len(self)
+        )
+
+    @property
+    def voxel_grids(self) -> list[VoxelGrid]:
+        """Voxel grids with packed voxel keys"""
+        return [
+            VoxelGrid(
+                np.asarray(info["min_bounds"]),
+                np.asarray(info["max_bounds"]),
+                info["voxel_size"],
+            )
+            for info in self.manifest["voxel_keys"]
+        ]
+
+    def get_voxel_keys(
+        self, voxel_grid: VoxelGrid
+    ) -> Optional[list[NDArray[Shape["*"], Int64]]]:
+        """
+        Gets packed voxel keys of each frame
+        :param voxel_grid: Voxel grid used for voxelization
+        :return: List of memory-mapped sorted voxel keys for each frame
+        or None if the keys for this voxel grid are not packed
+        """
+        min_bounds = np.asarray(voxel_grid.min_bounds).tolist()
+        for i, info in enumerate(self.manifest["voxel_keys"]):
+            if (
+                info["voxel_size"] == voxel_grid.voxel_size
+                and info["min_bounds"] == min_bounds
+            ):
+                return self.__load_ragged_arrays(f"voxel_keys_{i}")
+        return None
+
+    def get_global_descriptors(self, name: str) -> NDArray[Shape["*, *"], Float]:
+        """
+        Gets packed global descriptors
+        :param name: Name of the descriptors
+        :return: Memory-mapped descriptors of each frame
+        """
+        if name not in self.manifest["global_descriptors"]:
+            raise ValueError("Unknown descriptors: " + name)
+        return self.__load(f"global_descriptors_{name}.npy")
+
+    def get_local_descriptors(self, name: str) -> list[NDArray[Shape["*, *"], Float]]:
+        """
+        Gets packed local descriptors
+        :param name: Name of the descriptors
+        :return: List of memory-mapped descriptors for each frame
+        """
+        if name not in self.manifest["local_descriptors"]:
+            raise ValueError("Unknown descriptors: " + name)
+        return self.__load_ragged_arrays(f"local_descriptors_{name}")
+
+    def __load_ragged_arrays(self, name: str) -> list[np.ndarray]:
+        values = self.__load(f"{name}.npy")
+        offsets = self.__load(f"{name}_offsets.npy")
+        # np.split always returns at least one array
+        if len(offsets) == 1:
+            return []
+        return np.split(values, offsets[1:-1])
+
+    @staticmethod
+    def write(
+        database: "Database",
+        path: Path,
+        voxel_grids: Optional[list[VoxelGrid]] = None,
+        global_descriptors: Optional[dict[str, NDArray[Shape["*, *"], Float]]] = None,
+        local_descriptors: Optional[
+            dict[str, list[NDArray[Shape["*, *"], Float]]]
+        ] = None,
+    ):
+        """
+        Packs the database. Files of the frames are not copied,
+        the packed database refers to them by relative paths
+        :param database: Database for packing
+        :param path: Directory of the packed database. Will be created if it does not exist
+        :param voxel_grids: Voxel grids for calculating voxel keys of the frames
+        :param global_descriptors: Global descriptors of the frames by their names
+        :param local_descriptors: Local descriptors of the frames by their names
+        """
+        voxel_grids = [] if voxel_grids is None else voxel_grids
+        global_descriptors = {} if global_descriptors is None else global_descriptors
+        local_descriptors = {} if local_descriptors is None else local_descriptors
+        point_clouds_info = PackedDatabase.__get_point_clouds_info(database)
+        path.mkdir(parents=True, exist_ok=False)
+
+        def relative_paths(providers):
+            return np.asarray(
+                [os.path.relpath(provider.path, path) for provider in providers],
+                dtype=str,
+            )
+
+        np.save(path / "color_images.npy", relative_paths(database.color_images))
+        np.save(path / "point_clouds.npy", relative_paths(database.point_clouds))
+        np.save(
+            path / "trajectory.npy",
+            np.asarray(database.trajectory, dtype=np.float64).reshape(-1, 4, 4),
+        )
+
+        # Bounding boxes and voxel keys are calculated in one pass over the frames
+        aabbs = np.empty((len(database), 2, 3))
+        frames_voxels = [[] for _ in voxel_grids]
+        for frame in database.iter_frames(fields=("points_world",)):
+            i, points = frame.index, frame.points_world
+            if len(points) > 0:
+                aabbs[i] = points.min(axis=0), points.max(axis=0)
+            else:
+                aabbs[i] = [[np.inf], [-np.inf]]
+            for voxel_grid, voxels in zip(voxel_grids, frames_voxels):
+                voxels.append(voxel_grid.get_occupied_voxels(points))
+        np.save(path / "aabbs.npy", aabbs)
+
+        voxel_keys_info = []
+        for i, (voxel_grid, voxels) in enumerate(zip(voxel_grids, frames_voxels)):
+            PackedDatabase.__save_ragged_arrays(
+                path, f"voxel_keys_{i}", voxels, np.int64
+            )
+            voxel_keys_info.append(
+                {
+                    "voxel_size": voxel_grid.voxel_size,
+                    "min_bounds": np.asarray(voxel_grid.min_bounds).tolist(),
+                    "max_bounds": np.asarray(voxel_grid.max_bounds).tolist(),
+                }
+            )
+        for name, descriptors in global_descriptors.items():
+            np.save(path / f"global_descriptors_{name}.npy", np.asarray(descriptors))
+        for name, descriptors in local_descriptors.items():
+            PackedDatabase.__save_ragged_arrays(
+                path, f"local_descriptors_{name}", descriptors, np.float32
+            )
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "num_frames": len(database),
+            "point_clouds": point_clouds_info,
+            "voxel_keys": voxel_keys_info,
+            "global_descriptors": sorted(global_descriptors),
+            "local_descriptors": sorted(local_descriptors),
+        }
+        with open(path / MANIFEST_FILE_NAME, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+    @staticmethod
+    def __get_point_clouds_info(database: "Database") -> dict:
+        if all(isinstance(pcd, PointCloudProvider) for pcd in database.point_clouds):
+            return {"type": "point_cloud"}
+        if not all(
+            isinstance(pcd, DepthImageProvider) for pcd in database.point_clouds
+        ):
+            raise ValueError("Depth images and point clouds can't be packed together")
+        first_depth_image = database.point_clouds[0]
+        if any(
+            not np.array_equal(depth_image.intrinsics, first_depth_image.intrinsics)
+            or depth_image.depth_scale != first_depth_image.depth_scale
+            for depth_image in database.point_clouds
+        ):
+            raise ValueError(
+                "Only depth images with the same intrinsics and depth scale can be packed"
+            )
+        return {
+            "type": "depth",
+            "intrinsics": np.asarray(first_depth_image.intrinsics).tolist(),
+            "depth_scale": first_depth_image.depth_scale,
+        }
+
+    @staticmethod
+    def __save_ragged_arrays(
+        path: Path, name: str, arrays: list[np.ndarray], dtype: type
+    ):
+        sizes = [len(array) for array in arrays]
+        offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+        np.save(path / f"{name}_offsets.npy", offsets)
+        values = (
+            np.concatenate([np.asarray(array) for array in arrays])
+            if len(arrays) > 0
+            else np.empty(0, dtype=dtype)
+        )
+        np.save(path / f"{name}.npy", values)
@@ -0,0 +1,77 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import operator
+
+from collections.abc import Sequence
+from nptyping import Int64, NDArray, Shape
+from typing import Any, Callable
+
+
+class LazyProviders(Sequence):
+    """Read-only sequence which constructs providers only when they are accessed"""
+
+    def __init__(self, factory: Callable[[int], Any], length: int):
+        """
+        Constructs lazy sequence
+        :param factory: Function constructing the provider by its index
+        :param length: Number of providers
+        """
+        self.__factory = factory
+        self.__length = length
+
+    def __len__(self):
+        return self.__length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.__factory(i) for i in range(*index.indices(self.__length))]
+        index = operator.index(index)
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("Index out of range")
+        return self.__factory(index)
+
+
+class ProvidersView(Sequence):
+    """
+    Read-only sequence of providers selected from another sequence by indices.
+    Views of views refer to the original sequence, so they don't accumulate
+    """
+
+    def __init__(self, providers: Sequence, indices: NDArray[Shape["*"], Int64]):
+        """
+        Constructs view
+        :param providers: Original sequence of providers
+        :param indices: Indices of the selected providers
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if isinstance(providers, ProvidersView):
+            indices = providers.indices[indices]
+            providers = providers.providers
+        self.providers = providers
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ProvidersView(self.providers, self.indices[index])
+        return self.providers[int(self.indices[operator.index(index)])]
+
+    def __iter__(self):
+        for index in self.indices.tolist():
+            yield self.providers[index]
@@ -0,0 +1,113 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import tempfile
+
+from nptyping import Int64, NDArray, Shape
+from pathlib import Path
+from typing import Optional
+
+from vprdb.core.voxel_grid import KEY_AXIS_BITS
+
+
+class TiledVoxelMap:
+    """
+    Set of occupied voxels of the scene split into spatial tiles.
+    Tiles are slabs of voxels along the X axis, which are flushed to the hard drive
+    when the memory limit is exceeded, so the map doesn't have to fit into RAM
+    """
+
+    def __init__(
+        self,
+        tile_voxels: int,
+        memory_limit: int,
+        path_to_tiles: Optional[Path] = None,
+    ):
+        """
+        Constructs empty tiled map
+        :param tile_voxels: Number of voxels along the X axis in one tile
+        :param memory_limit: Maximum size of voxel keys kept in RAM in bytes
+        :param path_to_tiles: Directory for flushed tiles.
+        If not given, a temporary directory is used
+        """
+        self.tile_voxels = tile_voxels
+        self.memory_limit = memory_limit
+        self.__temp_dir = None
+        if path_to_tiles is None:
+            self.__temp_dir = tempfile.TemporaryDirectory()
+            path_to_tiles = Path(self.__temp_dir.name)
+        self.path_to_tiles = path_to_tiles
+        self.path_to_tiles.mkdir(parents=True, exist_ok=True)
+
+        self.__tiles_in_memory = dict()
+        self.__tiles_on_disk = dict()
+        self.__memory_usage = 0
+
+    def add(self, voxels: NDArray[Shape["*"], Int64]):
+        """
+        Adds voxels to the map
+        :param voxels: Voxel keys
+        """
+        voxels = np.unique(voxels)
+        tiles = (voxels >> (2 * KEY_AXIS_BITS)) // self.tile_voxels
+        tiles_bounds = np.flatnonzero(np.diff(tiles)) + 1
+        for tile_voxels in np.split(voxels, tiles_bounds):
+            if len(tile_voxels) == 0:
+                continue
+            tile = int(tile_voxels[0] >> (2 * KEY_AXIS_BITS)) // self.tile_voxels
+            self.__tiles_in_memory.setdefault(tile, []).append(tile_voxels)
+            self.__memory_usage += tile_voxels.nbytes
+
+        if self.__memory_usage > self.memory_limit:
+            self.__compact()
+            # Neighbouring frames overlap a lot, so compaction usually
+            # frees enough memory and flushing to the hard drive is rarely needed
+            if self.__memory_usage > self.memory_limit / 2:
+                self.__flush()
+
+    def __compact(self):
+        self.__memory_usage = 0
+        for tile, parts in self.__tiles_in_memory.items():
+            compacted = np.unique(np.concatenate(parts))
+            self.__tiles_in_memory[tile] = [compacted]
+            self.__memory_usage += compacted.nbytes
+
+    def __flush(self):
+        for tile, parts in self.__tiles_in_memory.items():
+            tile_parts = self.__tiles_on_disk.setdefault(tile, [])
+            path_to_part = self.path_to_tiles / f"tile_{tile}_{len(tile_parts)}.npy"
+            np.save(path_to_part, np.unique(np.concatenate(parts)))
+            tile_parts.append(path_to_part)
+        self.__tiles_in_memory = dict()
+        self.__memory_usage = 0
+
+    def __merge_tile(self, tile: int) -> NDArray[Shape["*"], Int64]:
+        parts = self.__tiles_in_memory.get(tile, []) + [
+            np.load(path_to_part) for path_to_part in self.__tiles_on_disk.get(tile, [])
+        ]
+        return np.unique(np.concatenate(parts))
+
+    def __len__(self):
+        tiles = set(self.__tiles_in_memory) | set(self.__tiles_on_disk)
+        return sum(len(self.__merge_tile(tile)) for tile in tiles)
+
+    def get_voxels(self) -> NDArray[Shape["*"], Int64]:
+        """
+        Merges all tiles of the map
+        :return: Sorted keys of all occupied voxels
+        """
+        tiles = sorted(set(self.__tiles_in_memory) | set(self.__tiles_on_disk))
+        # Tiles are ordered along the X axis as well as the keys
+        merged_tiles = [self.__merge_tile(tile) for tile in tiles]
+        return np.concatenate(merged_tiles + [np.empty(0, dtype=np.int64)])
@@ -14,12 +14,89 @@
 import numpy as np
 import open3d as o3d
 
-from nptyping import Float, NDArray, Shape
+from nptyping import Float, Int64, NDArray, Shape
 
 from vprdb.core.database import Database
+from vprdb.core.voxel_frames_index import VoxelFramesIndex
 from vprdb.core.voxel_grid import VoxelGrid
 
 
+def count_common_voxels(
+    voxels_1: NDArray[Shape["*"], Int64], voxels_2: NDArray[Shape["*"], Int64]
+) -> int:
+    """
+    Counts voxels shared by two frames with a single pass of binary search
+    :param voxels_1: Sorted voxel keys of the first frame
+    :param voxels_2: Sorted voxel keys of the second frame
+    :return: Size of the intersection
+    """
+    if len(voxels_1) > len(voxels_2):
+        voxels_1, voxels_2 = voxels_2, voxels_1
+    if len(voxels_1) == 0:
+        return 0
+    positions = np.searchsorted(voxels_2, voxels_1)
+    positions[positions == len(voxels_2)] = 0
+    return int(np.count_nonzero(voxels_2[positions] == voxels_1))
+
+
+def calculate_voxels_coverage(
+    query_voxels: NDArray[Shape["*"], Int64], db_voxels: NDArray[Shape["*"], Int64]
+) -> float:
+    """
+    Calculates coverage for query frame by database frame
+    :param query_voxels: Sorted voxel keys of the query frame
+    :param db_voxels: Sorted voxel keys of the database frame
+    :return: coverage ∈ [0; 1]. Empty query frame is not covered, so 0 is returned
+    """
+    if len(query_voxels) == 0:
+        return 0.0
+    return count_common_voxels(query_voxels, db_voxels) / len(query_voxels)
+
+
+def calculate_voxels_coverages(
+    query_voxels: NDArray[Shape["*"], Int64],
+    db_voxels: list[NDArray[Shape["*"], Int64]],
+) -> NDArray[Shape["*"], Float]:
+    """
+    Calculates coverages for query frame by each of the database frames at once
+    :param query_voxels: Sorted voxel keys of the query frame
+    :param db_voxels: List of sorted voxel keys of the database frames
+    :return: Coverages ∈ [0; 1] for each database frame.
+    Empty query frame is not covered, so zeros are returned
+    """
+    if len(db_voxels) == 0:
+        return np.empty(0)
+    if len(query_voxels) == 0:
+        return np.zeros(len(db_voxels))
+    frames_sizes = [len(voxels) for voxels in db_voxels]
+    all_db_voxels = np.concatenate(db_voxels)
+    if len(all_db_voxels) > 0:
+        positions = np.searchsorted(query_voxels, all_db_voxels)
+        positions[positions == len(query_voxels)] = 0
+        is_common = query_voxels[positions] == all_db_voxels
+    else:
+        is_common = np.zeros(len(all_db_voxels), dtype=bool)
+    frames = np.repeat(np.arange(len(db_voxels)), frames_sizes)
+    intersections = np.bincount(frames, weights=is_common, minlength=len(db_voxels))
+    return intersections / len(query_voxels)
+
+
+def calculate_voxels_iou(
+    voxels_1: NDArray[Shape["*"], Int64], voxels_2: NDArray[Shape["*"], Int64]
+) -> float:
+    """
+    Calculates IoU for two frames
+    :param voxels_1: Sorted voxel keys of the first frame
+    :param voxels_2: Sorted voxel keys of the second frame
+    :return: IoU ∈ [0; 1]. If both frames are empty, 0 is returned
+    """
+    intersection_size = count_common_voxels(voxels_1, voxels_2)
+    united_map_size = len(voxels_1) + len(voxels_2) - intersection_size
+    if united_map_size == 0:
+        return 0.0
+    return intersection_size / united_map_size
+
+
 def calculate_point_cloud_coverage(
     query_pcd: o3d.geometry.PointCloud,
     db_pcd: o3d.geometry.PointCloud,
@@ -32,13 +109,10 @@ def calculate_point_cloud_coverage(
     :param voxel_grid: voxel grid for down sampling
     :return: coverage ∈ [0; 1]
     """
-    query_pcd = voxel_grid.voxel_down_sample(query_pcd)
-    db_pcd = voxel_grid.voxel_down_sample(db_pcd)
-    united_map = voxel_grid.voxel_down_sample(query_pcd + db_pcd)
-
-    query_size = len(query_pcd.points)
-    intersection_size = query_size + len(db_pcd.points) - len(united_map.points)
-    return intersection_size / query_size
+    return calculate_voxels_coverage(
+        voxel_grid.get_occupied_voxels(query_pcd),
+        voxel_grid.get_occupied_voxels(db_pcd),
+    )
 
 
 def calculate_iou(
@@ -53,14 +127,9 @@ def calculate_iou(
     :param voxel_grid: Voxel grid for down sampling
     :return: IoU ∈ [0; 1]
     """
-    pcd_1 = voxel_grid.voxel_down_sample(pcd_1)
-    pcd_2 = voxel_grid.voxel_down_sample(pcd_2)
-    united_map = voxel_grid.voxel_down_sample(pcd_1 + pcd_2)
-
-    united_map_size = len(united_map.points)
-    intersection_size = len(pcd_1.points) + len(pcd_2.points) - united_map_size
-    iou = intersection_size / united_map_size
-    return iou
+    return calculate_voxels_iou(
+        voxel_grid.get_occupied_voxels(pcd_1), voxel_grid.get_occupied_voxels(pcd_2)
+    )
 
 
 def match_two_databases(
@@ -75,18 +144,11 @@ def match_two_databases(
     The i-th value from the list is the index of the frame from the target database,
     which is matched with the i-th source frame
     """
+    target_index = VoxelFramesIndex(target_db.get_voxel_keys(voxel_grid))
     matches = []
-    for pose, pcd_raw in zip(source_db.trajectory, source_db.point_clouds):
-        cur_coverages = []
-        for target_pose, target_pcd in zip(
-            target_db.trajectory, target_db.point_clouds
-        ):
-            pcd_query = pcd_raw.point_cloud.transform(pose)
-            pcd_db = target_pcd.point_cloud.transform(target_pose)
-            coverage = calculate_point_cloud_coverage(pcd_query, pcd_db, voxel_grid)
-            cur_coverages.append(coverage)
-        best_match = np.argmax(cur_coverages)
-        matches.append(int(best_match))
+    for query_voxels in source_db.get_voxel_keys(voxel_grid):
+        best_match = target_index.find_best_match(query_voxels)
+        matches.append(best_match)
     return matches
 
 
@@ -0,0 +1,141 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+
+from nptyping import Int64, NDArray, Shape
+from scipy import sparse
+from typing import Optional
+
+
+class VoxelFramesIndex:
+    """
+    Inverted index which maps every voxel to the frames covering it.
+    It allows to find frames overlapping with a query
+    without comparing the query with every frame
+    """
+
+    def __init__(self, frames_voxels: list[NDArray[Shape["*"], Int64]]):
+        """
+        Constructs inverted index
+        :param frames_voxels: List of sorted voxel keys for each frame
+        """
+        self.num_frames = len(frames_voxels)
+        frames_sizes = [len(voxels) for voxels in frames_voxels]
+        all_voxels = (
+            np.concatenate(frames_voxels)
+            if sum(frames_sizes) > 0
+            else np.empty(0, dtype=np.int64)
+        )
+        all_frames = np.repeat(np.arange(self.num_frames), frames_sizes)
+        # Keys in order of frames allow to get voxels of any frame
+        self.frames_voxels = all_voxels
+        self.frames_offsets = np.concatenate(([0], np.cumsum(frames_sizes))).astype(
+            np.int64
+        )
+        order = np.argsort(all_voxels, kind="stable")
+        self.voxels = all_voxels[order]
+        self.frames = all_frames[order]
+
+    def get_frame_voxels(self, frame: int) -> NDArray[Shape["*"], Int64]:
+        """
+        Gets voxels of the indexed frame
+        :param frame: Index of the frame
+        :return: Sorted voxel keys of the frame
+        """
+        return self.frames_voxels[
+            self.frames_offsets[frame] : self.frames_offsets[frame + 1]
+        ]
+
+    def count_overlaps(
+        self, voxels: NDArray[Shape["*"], Int64]
+    ) -> tuple[NDArray[Shape["*"], Int64], NDArray[Shape["*"], Int64]]:
+        """
+        Counts the number of voxels shared by the query and indexed frames
+        :param voxels: Sorted voxel keys of the query
+        :return: Indices of frames sharing at least one voxel with the query
+        in ascending order and the number of shared voxels for each of them
+        """
+        starts = np.searchsorted(self.voxels, voxels, side="left")
+        ends = np.searchsorted(self.voxels, voxels, side="right")
+        lengths = ends - starts
+        total = lengths.sum()
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        # Positions of all index entries which belong to query voxels
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions = offsets + np.arange(total)
+        return np.unique(self.frames[positions], return_counts=True)
+
+    def find_best_match(self, voxels: NDArray[Shape["*"], Int64]) -> int:
+        """
+        Finds the frame sharing the largest number of voxels with the query.
+        In case of equal overlaps, the frame with the smallest index is chosen
+        :param voxels: Sorted voxel keys of the query
+        :return: Index of the best frame
+        """
+        frames, counts = self.count_overlaps(voxels)
+        if len(frames) == 0:
+            return 0
+        return int(frames[np.argmax(counts)])
+
+
+def calculate_overlap_matrix(
+    frames_voxels: list[NDArray[Shape["*"], Int64]],
+    other_voxels: Optional[list[NDArray[Shape["*"], Int64]]] = None,
+) -> tuple[sparse.csr_matrix, NDArray[Shape["*"], Int64], NDArray[Shape["*"], Int64]]:
+    """
+    Calculates the number of voxels shared by every pair of frames.
+    The matrix is obtained as a product of sparse frames × voxels incidence matrices,
+    so only the pairs of overlapping frames are stored
+    :param frames_voxels: List of sorted voxel keys for each frame
+    :param other_voxels: List of sorted voxel keys for each frame to be compared with.
+    If not given, frames are compared with each other
+    :return: Sparse matrix where (i, j) element is the number of voxels shared by
+    the i-th frame and the j-th other frame,
+    numbers of voxels in frames and numbers of voxels in other frames
+    """
+    is_self_overlap = other_voxels is None
+    other_voxels = frames_voxels if is_self_overlap else other_voxels
+    sizes = np.asarray([len(voxels) for voxels in frames_voxels], dtype=np.int64)
+    other_sizes = np.asarray([len(voxels) for voxels in other_voxels], dtype=np.int64)
+
+    # Voxels of both lists are enumerated together to get common columns
+    voxels_lists = list(frames_voxels)
+    if not is_self_overlap:
+        voxels_lists += list(other_voxels)
+    all_voxels = np.concatenate(voxels_lists + [np.empty(0, dtype=np.int64)])
+    _, columns = np.unique(all_voxels, return_inverse=True)
+    columns = columns.reshape(-1)
+    num_voxels = columns.max() + 1 if len(columns) > 0 else 0
+
+    def to_incidence_matrix(frames_columns, frames_sizes):
+        return sparse.csr_matrix(
+            (
+                np.ones(len(frames_columns), dtype=np.int32),
+                frames_columns,
+                np.concatenate(([0], np.cumsum(frames_sizes))),
+            ),
+            shape=(len(frames_sizes), num_voxels),
+        )
+
+    incidence = to_incidence_matrix(columns[: sizes.sum()], sizes)
+    other_incidence = (
+        incidence
+        if is_self_overlap
+        else to_incidence_matrix(columns[sizes.sum() :], other_sizes)
+    )
+    intersections = (incidence @ other_incidence.T).tocsr()
+    intersections.sort_indices()
+    return intersections, sizes, other_sizes
@@ -15,7 +15,12 @@ import numpy as np
 import open3d as o3d
 
 from dataclasses import dataclass
-from nptyping import Float, NDArray, Shape
+from nptyping import Float, Int64, NDArray, Shape
+from typing import Optional
+
+# Number of bits used for every axis of the packed voxel key
+KEY_AXIS_BITS = 21
+KEY_AXIS_OFFSET = 1 << (KEY_AXIS_BITS - 1)
 
 
 @dataclass
@@ -26,6 +31,23 @@ class VoxelGrid:
     max_bounds: NDArray[Shape["3"], Float]
     voxel_size: float
 
+    @classmethod
+    def from_origin(
+        cls,
+        voxel_size: float,
+        origin: Optional[NDArray[Shape["3"], Float]] = None,
+    ):
+        """
+        Constructs the voxel grid anchored at a fixed origin instead of the scene bounds.
+        Voxel keys of such grid are not limited by bounds,
+        so the grid can be created without reading the data in advance
+        :param voxel_size: Voxel size
+        :param origin: Origin of the grid, zero by default
+        :return: Constructed voxel grid
+        """
+        origin = np.zeros(3) if origin is None else np.asarray(origin, dtype=float)
+        return cls(origin, origin, voxel_size)
+
     def get_voxel_index(
         self, point: NDArray[Shape["3"], Float]
     ) -> tuple[int, int, int]:
@@ -53,6 +75,65 @@ class VoxelGrid:
             + (np.asarray(self.get_voxel_index(point)) * self.voxel_size)
         )
 
+    def get_voxel_indices(
+        self, points: NDArray[Shape["*, 3"], Float]
+    ) -> NDArray[Shape["*, 3"], Int64]:
+        """
+        The method gets voxel indices for an array of points.
+        Implemented according to the corresponding Open3D method
+        :param points: Points to get their corresponding voxel indices
+        :return: Voxel indices
+        """
+        ref_coords = (np.asarray(points) - self.min_bounds) / self.voxel_size
+        return np.floor(ref_coords).astype(np.int64)
+
+    def get_voxels_coordinates(
+        self, points: NDArray[Shape["*, 3"], Float]
+    ) -> NDArray[Shape["*, 3"], Float]:
+        """
+        The method gets voxel coordinates for an array of points.
+        Implemented according to the corresponding Open3D method
+        :param points: Points to get their corresponding voxel coordinates
+        :return: Voxel coordinates
+        """
+        return self.min_bounds + self.get_voxel_indices(points) * self.voxel_size
+
+    def get_voxel_keys(
+        self, points: NDArray[Shape["*, 3"], Float]
+    ) -> NDArray[Shape["*"], Int64]:
+        """
+        The method gets voxel keys for an array of points.
+        Voxel key is a voxel index packed into one 64-bit integer
+        :param points: Points to get their corresponding voxel keys
+        :return: Voxel keys
+        """
+        indices = self.get_voxel_indices(points) + KEY_AXIS_OFFSET
+        if len(indices) > 0 and (
+            indices.min() < 0 or indices.max() >= (1 << KEY_AXIS_BITS)
+        ):
+            raise ValueError("Voxel size is too small for packing voxel indices")
+        return (
+            (indices[:, 0] << (2 * KEY_AXIS_BITS))
+            | (indices[:, 1] << KEY_AXIS_BITS)
+            | indices[:, 2]
+        )
+
+    @staticmethod
+    def unpack_voxel_keys(
+        keys: NDArray[Shape["*"], Int64]
+    ) -> NDArray[Shape["*, 3"], Int64]:
+        """
+        The method unpacks voxel keys back into voxel indices
+        :param keys: Voxel keys
+        :return: Voxel indices
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        mask = (1 << KEY_AXIS_BITS) - 1
+        indices = np.column_stack(
+            (keys >> (2 * KEY_AXIS_BITS), (keys >> KEY_AXIS_BITS) & mask, keys & mask)
+        )
+        return indices - KEY_AXIS_OFFSET
+
     def voxel_down_sample(
         self, point_cloud: o3d.geometry.PointCloud
     ) -> o3d.geometry.PointCloud:
@@ -65,3 +146,17 @@ class VoxelGrid:
             self.voxel_size, self.min_bounds, self.max_bounds
         )
         return voxel_down_result
+
+    def get_occupied_voxels(
+        self, point_cloud: o3d.geometry.PointCloud | NDArray[Shape["*, 3"], Float]
+    ) -> NDArray[Shape["*"], Int64]:
+        """
+        The method gets the voxels occupied by a given point cloud.
+        Voxel keys are much more compact than a down sampled point cloud
+        and can be intersected with other frames
+        :param point_cloud: Point cloud or array of points for voxelization
+        :return: Sorted array of unique voxel keys
+        """
+        if isinstance(point_cloud, o3d.geometry.PointCloud):
+            point_cloud = np.asarray(point_cloud.points)
+        return np.unique(self.get_voxel_keys(point_cloud))
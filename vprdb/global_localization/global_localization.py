@@ -12,7 +12,12 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import faiss
+import hashlib
+import json
+import numpy as np
 
+from nptyping import Float32, NDArray, Shape
+from pathlib import Path
 from tqdm import tqdm
 from typing import Optional
 
@@ -32,7 +37,33 @@ class GlobalLocalization:
         global_extractor: CosPlace | NetVLAD,
         source_db: Database,
         local_matcher: Optional[SuperGlue] = None,
+        index_factory: str = "Flat",
+        train_size: Optional[int] = None,
+        path_to_index: Optional[Path] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        seed: int = 0,
     ):
+        """
+        Constructs the predictor
+        :param global_extractor: Extractor of global descriptors
+        :param source_db: Database in which the queries are localized
+        :param local_matcher: Matcher of local features for choosing the best match
+        :param index_factory: FAISS index factory string, e.g. "Flat", "IVF1024,Flat",
+        "IVF1024,PQ64", "HNSW32" or "OPQ64,IVF1024,PQ64"
+        :param train_size: Number of descriptors randomly sampled for training the index.
+        If not given, all descriptors of the source database are used.
+        It must be at least the number of IVF lists and PQ centroids, e.g. 256 for PQ8
+        :param path_to_index: Path to the file of the index. If the file exists,
+        the index is loaded from it, otherwise the built index is saved to it.
+        Parameters of the index and the hash of the source descriptors are saved
+        next to it in the file with ".json" suffix and checked on loading
+        :param nprobe: Number of inverted lists visited by IVF indexes during search
+        :param ef_search: Size of the candidates list of HNSW indexes during search
+        :param seed: Seed for sampling training descriptors
+        """
+        if train_size is not None and train_size < 1:
+            raise ValueError("Train size can't be below 1")
         self.__global_extractor = global_extractor
         self.__local_matcher = local_matcher
         self.__source_db = source_db
@@ -41,20 +72,117 @@ class GlobalLocalization:
         self.source_global_descs = self.__global_extractor.get_database_descriptors(
             self.__source_db
         )
-        self.faiss_index = faiss.IndexFlatL2(self.source_global_descs.shape[1])
-        self.faiss_index.add(self.source_global_descs)
+        source_global_descs = np.ascontiguousarray(
+            self.source_global_descs, dtype=np.float32
+        )
+        index_info = None
+        if path_to_index is not None:
+            index_info = {
+                "index_factory": index_factory,
+                "train_size": train_size,
+                "seed": seed,
+                "descriptors_hash": hashlib.sha256(source_global_descs).hexdigest(),
+            }
+        if path_to_index is not None and Path(path_to_index).exists():
+            path_to_index_info = Path(str(path_to_index) + ".json")
+            if not path_to_index_info.exists():
+                raise ValueError(
+                    "Parameters of index in {} are unknown".format(path_to_index)
+                )
+            with open(path_to_index_info, "r") as index_info_file:
+                saved_index_info = json.load(index_info_file)
+            if saved_index_info != index_info:
+                raise ValueError(
+                    "Index in {} was built with other parameters "
+                    "or for other descriptors".format(path_to_index)
+                )
+            self.faiss_index = faiss.read_index(str(path_to_index))
+        else:
+            print("Building of FAISS index")
+            self.faiss_index = GlobalLocalization.__build_faiss_index(
+                source_global_descs, index_factory, train_size, seed
+            )
+            if path_to_index is not None:
+                faiss.write_index(self.faiss_index, str(path_to_index))
+                with open(str(path_to_index) + ".json", "w") as index_info_file:
+                    json.dump(index_info, index_info_file, indent=2)
+        self.set_search_parameters(nprobe, ef_search)
         if self.__local_matcher is not None:
             print("Calculating of local features for source DB")
             self.source_local_features = self.__local_matcher.get_database_features(
                 self.__source_db
             )
 
+    @staticmethod
+    def __build_faiss_index(
+        descriptors: NDArray[Shape["*, *"], Float32],
+        index_factory: str,
+        train_size: Optional[int],
+        seed: int,
+    ) -> faiss.Index:
+        index = faiss.index_factory(descriptors.shape[1], index_factory)
+        if not index.is_trained:
+            train_descriptors = descriptors
+            if train_size is not None and train_size < len(descriptors):
+                rng = np.random.default_rng(seed)
+                sample = np.sort(
+                    rng.choice(len(descriptors), train_size, replace=False)
+                )
+                train_descriptors = descriptors[sample]
+            min_train_size = GlobalLocalization.__get_min_train_size(index)
+            if len(train_descriptors) < min_train_size:
+                raise ValueError(
+                    "Index {} requires at least {} descriptors for training, "
+                    "but {} are given".format(
+                        index_factory, min_train_size, len(train_descriptors)
+                    )
+                )
+            index.train(train_descriptors)
+        index.add(descriptors)
+        return index
+
+    @staticmethod
+    def __get_min_train_size(index: faiss.Index) -> int:
+        # K-means of IVF and PQ requires at least as many points as centroids,
+        # and PCA requires at least as many points as output dimensions
+        min_train_size = 1
+        if isinstance(index, faiss.IndexPreTransform):
+            for i in range(index.chain.size()):
+                transform = faiss.downcast_VectorTransform(index.chain.at(i))
+                if isinstance(transform, faiss.OPQMatrix):
+                    # OPQ trains its own 8-bit product quantizer
+                    min_train_size = max(min_train_size, 256)
+                elif isinstance(transform, (faiss.PCAMatrix, faiss.ITQTransform)):
+                    min_train_size = max(min_train_size, transform.d_out)
+            index = faiss.downcast_index(index.index)
+        if isinstance(index, faiss.IndexIVF):
+            min_train_size = max(min_train_size, index.nlist)
+        pq = getattr(index, "pq", None)
+        if pq is not None:
+            min_train_size = max(min_train_size, pq.ksub)
+        return min_train_size
+
+    def set_search_parameters(
+        self, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+    ):
+        """
+        Sets parameters of the search trading accuracy for speed
+        :param nprobe: Number of inverted lists visited by IVF indexes
+        :param ef_search: Size of the candidates list of HNSW indexes
+        """
+        parameter_space = faiss.ParameterSpace()
+        if nprobe is not None:
+            parameter_space.set_index_parameter(self.faiss_index, "nprobe", nprobe)
+        if ef_search is not None:
+            parameter_space.set_index_parameter(self.faiss_index, "efSearch", ef_search)
+
     def predict(self, query_database: Database, k_closest: int = 1) -> list[int]:
         """
         Predicts query matches
         :param query_database: The database for which the predictions will be calculated
         :param k_closest: Specifies how many predictions for each query the global localization should make.
-        If this value is greater than 1, the best match will be chosen with local matcher
+        If this value is greater than 1, the best match will be chosen with local matcher.
+        Neighbours missing in the results of the index are skipped
         :return: Indexes of frames from the database, corresponding to the query frames
         """
         if k_closest < 1:
@@ -69,6 +197,17 @@ class GlobalLocalization:
             query_database
         )
         _, global_predictions = self.faiss_index.search(queries_global_descs, k_closest)
+        # FAISS returns -1 labels if fewer neighbours are found,
+        # e.g. when IVF indexes visit too few inverted lists
+        global_predictions = [
+            prediction[prediction >= 0] for prediction in global_predictions
+        ]
+        for i, prediction in enumerate(global_predictions):
+            if len(prediction) == 0:
+                raise ValueError(
+                    "No matches are found for query {}, "
+                    "try to increase nprobe of the index".format(i)
+                )
 
         if k_closest == 1:
             return [prediction[0] for prediction in global_predictions]
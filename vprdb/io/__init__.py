@@ -45,3 +45,4 @@ in the trajectory file must be the same. The names of folders and the trajectory
 """
 from vprdb.io.export_utils import export
 from vprdb.io.read_utils import read_dataset_from_depth, read_dataset_from_point_clouds
+from vprdb.io.trajectory_utils import read_trajectory, write_trajectory
@@ -11,23 +11,12 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-import mrob
-import numpy as np
 import shutil
 
 from pathlib import Path
 
 from vprdb.core import Database
-
-
-def __poses_to_txt(poses, filename_to_write):
-    with open(filename_to_write, "w") as trajectory_file:
-        for pose in poses:
-            R = pose[:3, :3]
-            t = pose[:3, 3]
-            quat = mrob.geometry.so3_to_quat(R)
-            pose_string = " ".join(np.concatenate((t, quat)).astype(str))
-            trajectory_file.write(f"{pose_string}\n")
+from vprdb.io.trajectory_utils import write_trajectory
 
 
 def export(
@@ -56,4 +45,4 @@ def export(
     for point_cloud in database.point_clouds:
         shutil.copyfile(point_cloud.path, path_to_point_clouds / point_cloud.path.name)
 
-    __poses_to_txt(database.trajectory, path_to_export / trajectory_file_name)
+    write_trajectory(database.trajectory, path_to_export / trajectory_file_name)
@@ -11,32 +11,11 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-import mrob
-import numpy as np
-
 from nptyping import Float, NDArray, Shape
 from pathlib import Path
 
 from vprdb.core import Database
-
-
-def __load_poses(poses_path: Path, with_timestamps: bool):
-    poses_quat = []
-    with open(poses_path, "r") as file:
-        for line in file:
-            poses_quat.append([float(i) for i in line.strip().split(" ")])
-
-    poses = []
-    for pose in poses_quat:
-        t = pose[1:4] if with_timestamps else pose[:3]
-        R = pose[4:8] if with_timestamps else pose[3:7]
-        R = mrob.geometry.quat_to_so3(R)
-        T = np.eye(4)
-        T[:3, :3] = R
-        T[:3, 3] = t
-        poses.append(T)
-
-    return poses
+from vprdb.io.trajectory_utils import read_trajectory
 
 
 def __read_dir(dir_path: Path) -> list[Path]:
@@ -65,7 +44,7 @@ def read_dataset_from_depth(
     rgb_images = __read_dir(path_to_dataset / color_dir)
     depth_images = __read_dir(path_to_dataset / depth_dir)
 
-    traj = __load_poses(path_to_dataset / trajectory_file_name, with_timestamps)
+    traj = read_trajectory(path_to_dataset / trajectory_file_name, with_timestamps)
 
     database = Database.from_depth_images(
         rgb_images, depth_images, depth_scale, intrinsics, traj
@@ -91,7 +70,7 @@ def read_dataset_from_point_clouds(
     rgb_images = __read_dir(path_to_dataset / color_dir)
     point_clouds = __read_dir(path_to_dataset / point_clouds_dir)
 
-    traj = __load_poses(path_to_dataset / trajectory_file_name, with_timestamps)
+    traj = read_trajectory(path_to_dataset / trajectory_file_name, with_timestamps)
 
     database = Database.from_point_clouds(rgb_images, point_clouds, traj)
     return database
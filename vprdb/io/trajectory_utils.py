@@ -0,0 +1,125 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+
+from nptyping import Float, NDArray, Shape
+from pathlib import Path
+
+
+def quaternions_to_rotations(
+    quaternions: NDArray[Shape["*, 4"], Float]
+) -> NDArray[Shape["*, 3, 3"], Float]:
+    """
+    Converts quaternions to rotation matrices. Quaternions are normalized before conversion
+    :param quaternions: Quaternions in qx, qy, qz, qw format
+    :return: Rotation matrices
+    """
+    quaternions = np.asarray(quaternions, dtype=np.float64)
+    quaternions = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+    x, y, z, w = quaternions.T
+    rotations = np.empty((len(quaternions), 3, 3))
+    rotations[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    rotations[:, 0, 1] = 2 * (x * y - z * w)
+    rotations[:, 0, 2] = 2 * (x * z + y * w)
+    rotations[:, 1, 0] = 2 * (x * y + z * w)
+    rotations[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    rotations[:, 1, 2] = 2 * (y * z - x * w)
+    rotations[:, 2, 0] = 2 * (x * z - y * w)
+    rotations[:, 2, 1] = 2 * (y * z + x * w)
+    rotations[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return rotations
+
+
+def rotations_to_quaternions(
+    rotations: NDArray[Shape["*, 3, 3"], Float]
+) -> NDArray[Shape["*, 4"], Float]:
+    """
+    Converts rotation matrices to quaternions.
+    The same branches as in Eigen are used, so the signs of quaternions match it
+    :param rotations: Rotation matrices
+    :return: Quaternions in qx, qy, qz, qw format
+    """
+    rotations = np.asarray(rotations, dtype=np.float64)
+    quaternions = np.empty((len(rotations), 4))
+    trace = np.trace(rotations, axis1=1, axis2=2)
+
+    positive = np.flatnonzero(trace > 0)
+    m = rotations[positive]
+    t = np.sqrt(trace[positive] + 1)
+    quaternions[positive, 3] = 0.5 * t
+    t = 0.5 / t
+    quaternions[positive, 0] = (m[:, 2, 1] - m[:, 1, 2]) * t
+    quaternions[positive, 1] = (m[:, 0, 2] - m[:, 2, 0]) * t
+    quaternions[positive, 2] = (m[:, 1, 0] - m[:, 0, 1]) * t
+
+    # Otherwise, the calculation starts from the largest diagonal element
+    other = np.flatnonzero(trace <= 0)
+    m = rotations[other]
+    rows = np.arange(len(other))
+    diagonal = np.diagonal(m, axis1=1, axis2=2)
+    i = np.where(diagonal[:, 1] > diagonal[:, 0], 1, 0)
+    i = np.where(diagonal[:, 2] > diagonal[rows, i], 2, i)
+    j = (i + 1) % 3
+    k = (j + 1) % 3
+    t = np.sqrt(m[rows, i, i] - m[rows, j, j] - m[rows, k, k] + 1)
+    other_quaternions = np.empty((len(other), 4))
+    other_quaternions[rows, i] = 0.5 * t
+    t = 0.5 / t
+    other_quaternions[:, 3] = (m[rows, k, j] - m[rows, j, k]) * t
+    other_quaternions[rows, j] = (m[rows, j, i] + m[rows, i, j]) * t
+    other_quaternions[rows, k] = (m[rows, k, i] + m[rows, i, k]) * t
+    quaternions[other] = other_quaternions
+    return quaternions
+
+
+def read_trajectory(
+    path_to_trajectory: Path, with_timestamps: bool = True
+) -> NDArray[Shape["*, 4, 4"], Float]:
+    """
+    Reads the trajectory with one pose in each line in `timestamp tx ty tz qx qy qz qw` format
+    :param path_to_trajectory: Path to the file with trajectory
+    :param with_timestamps: Indicates that a trajectory with timestamps is given
+    :return: Camera poses
+    """
+    poses_quat = np.loadtxt(path_to_trajectory, dtype=np.float64, ndmin=2)
+    if len(poses_quat) == 0:
+        return np.empty((0, 4, 4))
+    if with_timestamps:
+        poses_quat = poses_quat[:, 1:]
+    poses = np.zeros((len(poses_quat), 4, 4))
+    poses[:, :3, :3] = quaternions_to_rotations(poses_quat[:, 3:7])
+    poses[:, :3, 3] = poses_quat[:, :3]
+    poses[:, 3, 3] = 1
+    return poses
+
+
+def write_trajectory(
+    trajectory: NDArray[Shape["*, 4, 4"], Float], path_to_trajectory: Path
+):
+    """
+    Writes the trajectory with one pose in each line in `tx ty tz qx qy qz qw` format
+    :param trajectory: Camera poses
+    :param path_to_trajectory: Path to the file for writing
+    """
+    trajectory = np.asarray(trajectory, dtype=np.float64).reshape(-1, 4, 4)
+    poses_quat = np.column_stack(
+        (trajectory[:, :3, 3], rotations_to_quaternions(trajectory[:, :3, :3]))
+    )
+    # Formatting all values at once is much faster than writing them line by line.
+    # 17 significant digits are enough to read exactly the same doubles
+    line_format = " ".join(["%.17g"] * 7) + "\n"
+    with open(path_to_trajectory, "w") as trajectory_file:
+        trajectory_file.write(
+            (line_format * len(poses_quat)) % tuple(poses_quat.ravel().tolist())
+        )
@@ -11,11 +11,45 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import numpy as np
 import os
 
-from joblib import Parallel, delayed
+from joblib import delayed, effective_n_jobs, Parallel
+from nptyping import Int64, NDArray, Shape
+from scipy.spatial import cKDTree
 
-from vprdb.core import calculate_point_cloud_coverage, Database, VoxelGrid
+from vprdb.core import (
+    calculate_voxels_coverages,
+    Database,
+    VoxelFramesIndex,
+    VoxelGrid,
+)
+
+
+def __find_best_coverages(
+    reduced_index: VoxelFramesIndex,
+    queries_voxels: list[NDArray[Shape["*"], Int64]],
+    queries_candidates: NDArray[Shape["*, *"], Int64],
+) -> list[float]:
+    best_coverages = []
+    for query_voxels, candidates in zip(queries_voxels, queries_candidates):
+        if len(query_voxels) == 0:
+            best_coverages.append(0.0)
+            continue
+        # The closest reduced frames often cover the query completely,
+        # so the search stops early without scanning the index
+        candidates_coverages = calculate_voxels_coverages(
+            query_voxels,
+            [reduced_index.get_frame_voxels(candidate) for candidate in candidates],
+        )
+        if len(candidates_coverages) > 0 and candidates_coverages.max() == 1:
+            best_coverages.append(1.0)
+            continue
+        # Only reduced frames sharing voxels with the query are considered
+        _, intersections = reduced_index.count_overlaps(query_voxels)
+        best_intersection = intersections.max() if len(intersections) > 0 else 0
+        best_coverages.append(best_intersection / len(query_voxels))
+    return best_coverages
 
 
 def frames_coverage(
@@ -23,6 +57,8 @@ def frames_coverage(
     reduced_db: Database,
     voxel_size: float = 0.3,
     num_of_threads: int = os.cpu_count(),
+    num_of_pose_candidates: int = 3,
+    anchor_at_origin: bool = False,
 ) -> list[float]:
     """
     The metric determines how well the frames from the original database
@@ -31,26 +67,55 @@ def frames_coverage(
     :param original_db: Original database
     :param reduced_db: Reduced database
     :param voxel_size: Voxel size for down sampling
-    :param num_of_threads: Number of threads to parallelize calculations
+    :param num_of_threads: Number of worker processes to parallelize calculations.
+    Negative values are interpreted as in joblib, e.g. -1 means all CPUs
+    :param num_of_pose_candidates: Number of reduced frames closest to the query
+    by position, which are checked first for complete coverage of the query
+    :param anchor_at_origin: Whether to anchor the voxel grid at the origin
+    instead of the scene bounds. Bounds aren't calculated in this case,
+    but voxels are shifted relative to the bounds-anchored grid,
+    so the results may slightly differ
 
-    :return: A list of values indicating the level of coverage of a particular frame
+    :return: A list of values indicating the level of coverage of a particular frame.
+    Frames without points are considered as not covered
     """
-    min_bounds, max_bounds = original_db.bounds
-    voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
-
-    def find_best_coverage(pose, pcd_raw):
-        coverages_for_query = []
-        for reduced_db_pose, reduced_db_pcd in zip(
-            reduced_db.trajectory, reduced_db.point_clouds
-        ):
-            pcd_query = pcd_raw.point_cloud.transform(pose)
-            pcd_db = reduced_db_pcd.point_cloud.transform(reduced_db_pose)
-            coverage = calculate_point_cloud_coverage(pcd_query, pcd_db, voxel_grid)
-            coverages_for_query.append(coverage)
-        return max(coverages_for_query)
-
-    coverages = Parallel(n_jobs=num_of_threads)(
-        delayed(find_best_coverage)(pose, pcd_raw)
-        for pose, pcd_raw in zip(original_db.trajectory, original_db.point_clouds)
+    if num_of_pose_candidates < 0:
+        raise ValueError("Number of pose candidates can't be below 0")
+    if anchor_at_origin:
+        voxel_grid = VoxelGrid.from_origin(voxel_size)
+    else:
+        min_bounds, max_bounds = original_db.bounds
+        voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
+    original_voxels = original_db.get_voxel_keys(voxel_grid)
+    reduced_voxels = reduced_db.get_voxel_keys(voxel_grid)
+    # Large arrays of the index are shared with workers through memory mapping,
+    # so only indices of candidates are sent with each task
+    reduced_index = VoxelFramesIndex(reduced_voxels)
+
+    num_of_pose_candidates = min(num_of_pose_candidates, len(reduced_db))
+    if num_of_pose_candidates > 0:
+        tree = cKDTree(np.asarray(reduced_db.trajectory)[:, :3, 3])
+        _, candidates = tree.query(
+            np.asarray(original_db.trajectory)[:, :3, 3],
+            k=list(range(1, num_of_pose_candidates + 1)),
+        )
+    else:
+        candidates = np.empty((len(original_db), 0), dtype=np.int64)
+
+    num_of_jobs = effective_n_jobs(num_of_threads)
+    num_of_chunks = min(len(original_voxels), 4 * num_of_jobs)
+    chunks_bounds = np.linspace(0, len(original_voxels), num_of_chunks + 1, dtype=int)
+    chunks_coverages = Parallel(n_jobs=num_of_jobs)(
+        delayed(__find_best_coverages)(
+            reduced_index,
+            original_voxels[start:end],
+            candidates[start:end],
+        )
+        for start, end in zip(chunks_bounds[:-1], chunks_bounds[1:])
     )
+    coverages = [
+        float(coverage)
+        for chunk_coverages in chunks_coverages
+        for coverage in chunk_coverages
+    ]
     return coverages
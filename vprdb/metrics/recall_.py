@@ -11,9 +11,12 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-import numpy as np
-
-from vprdb.core import calculate_point_cloud_coverage, Database, VoxelGrid
+from vprdb.core import (
+    calculate_voxels_coverage,
+    Database,
+    find_bounds_for_multiple_databases,
+    VoxelGrid,
+)
 
 
 def recall(
@@ -22,6 +25,7 @@ def recall(
     matches: list[int],
     voxel_size: float = 0.3,
     threshold: float = 0.3,
+    anchor_at_origin: bool = False,
 ) -> float:
     """
     The metric finds the number of correctly matched frames
@@ -34,6 +38,10 @@ def recall(
     :param voxel_size: Voxel size for down sampling
     :param threshold: The value of frame coverage,
     below which the frame will be considered uncovered
+    :param anchor_at_origin: Whether to anchor the voxel grid at the origin
+    instead of the scene bounds. Bounds aren't calculated in this case,
+    but voxels are shifted relative to the bounds-anchored grid,
+    so the results may slightly differ
 
     :return: Recall value
     """
@@ -42,21 +50,18 @@ def recall(
             "The length of the matches and the test database must be the same"
         )
 
-    min_bounds_test, max_bounds_test = test_db.bounds
-    min_bounds_source, max_bounds_source = source_db.bounds
-    min_bounds = np.amin(np.row_stack((min_bounds_test, min_bounds_source)), axis=0)
-    max_bounds = np.amax(np.row_stack((max_bounds_test, max_bounds_source)), axis=0)
-
-    voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
+    if anchor_at_origin:
+        voxel_grid = VoxelGrid.from_origin(voxel_size)
+    else:
+        min_bounds, max_bounds = find_bounds_for_multiple_databases(
+            [test_db, source_db]
+        )
+        voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
+    test_voxels = test_db.get_voxel_keys(voxel_grid)
+    source_voxels = source_db.get_voxel_keys(voxel_grid)
     results = []
-    for i, match in enumerate(matches):
-        pose_query = test_db.trajectory[i]
-        pcd_query = test_db.point_clouds[i].point_cloud.transform(pose_query)
-
-        pose_source = source_db.trajectory[match]
-        pcd_source = source_db.point_clouds[match].point_cloud.transform(pose_source)
-
-        coverage = calculate_point_cloud_coverage(pcd_query, pcd_source, voxel_grid)
+    for query_voxels, match in zip(test_voxels, matches):
+        coverage = calculate_voxels_coverage(query_voxels, source_voxels[match])
         results.append(coverage > threshold)
 
     return sum(results) / len(results)
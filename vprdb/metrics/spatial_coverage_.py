@@ -19,6 +19,9 @@ def spatial_coverage(
     reduced_db: Database,
     voxel_size: float = 0.3,
     down_sample_step: int = 100,
+    tiled: bool = False,
+    tile_size: float = 100.0,
+    memory_limit: int = 1 << 30,
 ) -> float:
     """
     The metric determines how well the map from the original database is covered
@@ -27,12 +30,24 @@ def spatial_coverage(
     :param original_db: Original database
     :param reduced_db: Reduced database
     :param voxel_size: Voxel size for down sampling
-    :param down_sample_step: Voxel down sampling step for reducing RAM usage
+    :param down_sample_step: Voxel down sampling step for reducing RAM usage.
+    Not used in the tiled mode
+    :param tiled: Whether to build maps as sets of occupied voxels split into tiles,
+    which are flushed to the hard drive when the memory limit is exceeded.
+    Useful for the scenes which don't fit into RAM
+    :param tile_size: Size of the map tiles along the X axis in the tiled mode
+    :param memory_limit: Maximum size of the map kept in RAM in bytes in the tiled mode
 
     :return: the ratio of the number of points in the map from the reduced database
     after down sampling to the number of points in the map from the original database
-    after down sampling
+    after down sampling. In the tiled mode, numbers of occupied voxels are compared
     """
+    if tiled:
+        voxel_grid = VoxelGrid.from_origin(voxel_size)
+        original_map = original_db.build_voxel_map(voxel_grid, tile_size, memory_limit)
+        filtered_map = reduced_db.build_voxel_map(voxel_grid, tile_size, memory_limit)
+        return len(filtered_map) / len(original_map)
+
     min_bounds, max_bounds = original_db.bounds
     voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
     original_map = original_db.build_sparse_map(voxel_grid, down_sample_step)
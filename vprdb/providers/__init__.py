@@ -13,7 +13,9 @@
 #  limitations under the License.
 """
 Providers are designed as wrappers over various types of heavy data, to load them into RAM only when needed.
+Loaded data can be kept in `ProviderCache` shared by providers of the database.
 """
 from vprdb.providers.color_image_provider import ColorImageProvider
 from vprdb.providers.depth_image_provider import DepthImageProvider
 from vprdb.providers.point_cloud_provider import PointCloudProvider
+from vprdb.providers.provider_cache import ProviderCache
@@ -12,10 +12,23 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import cv2
+import math
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from nptyping import NDArray, Shape, UInt8
 from pathlib import Path
+from PIL import Image
+from typing import Optional
+
+from vprdb.providers.provider_cache import ProviderCache
+
+REDUCED_READ_FLAGS = {
+    1: (cv2.IMREAD_COLOR, cv2.IMREAD_GRAYSCALE),
+    2: (cv2.IMREAD_REDUCED_COLOR_2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+    4: (cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+    8: (cv2.IMREAD_REDUCED_COLOR_8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+}
+"""OpenCV flags for reading color and grayscale images with reduction factors"""
 
 
 @dataclass(frozen=True)
@@ -25,7 +38,84 @@ class ColorImageProvider:
     path: Path
     """Path to the file on the hard drive"""
 
+    cache: Optional[ProviderCache] = field(default=None, compare=False, repr=False)
+    """Optional cache shared by providers"""
+
     @property
     def color_image(self) -> NDArray[Shape["*, *, 3"], UInt8]:
-        """Returns image in OpenCV format"""
-        return cv2.imread(str(self.path), cv2.IMREAD_COLOR)
+        """
+        Returns image in OpenCV format.
+        If the cache is used, the image is read-only
+        """
+        if self.cache is None:
+            return self.__read_color_image()
+        return self.cache.get(
+            ("color_image", self.path),
+            self.__read_color_image,
+            lambda image: image.nbytes,
+        )
+
+    def __read_color_image(self) -> NDArray[Shape["*, *, 3"], UInt8]:
+        image = cv2.imread(str(self.path), cv2.IMREAD_COLOR)
+        if self.cache is not None and image is not None:
+            image.setflags(write=False)
+        return image
+
+    def get_color_image(
+        self,
+        size: Optional[tuple[int, int]] = None,
+        grayscale: bool = False,
+        interpolation: int = cv2.INTER_AREA,
+    ) -> NDArray[Shape["*, *, ..."], UInt8]:
+        """
+        Returns image of the given size. If the size is a half, a quarter or an eighth
+        of the native size or less, the image is decoded at reduced resolution,
+        which is much faster for JPEG images. If the cache is used, the image is read-only
+        :param size: Target size of the image as (width, height).
+        If not given, the image is not resized
+        :param grayscale: Whether to read the image in grayscale
+        :param interpolation: OpenCV interpolation for the remaining resizing
+        :return: Image in OpenCV format
+        """
+        if size is None and not grayscale:
+            return self.color_image
+        if self.cache is None:
+            return self.__read_resized_image(size, grayscale, interpolation)
+        return self.cache.get(
+            ("color_image", self.path, size, grayscale, interpolation),
+            lambda: self.__read_resized_image(size, grayscale, interpolation),
+            lambda image: image.nbytes,
+        )
+
+    def __get_reduction_factor(self, size: Optional[tuple[int, int]]) -> int:
+        if size is None:
+            return 1
+        try:
+            # Only the header of the image is read
+            with Image.open(self.path) as image:
+                native_width, native_height = image.size
+        except OSError:
+            return 1
+        width, height = size
+        return max(
+            factor
+            for factor in REDUCED_READ_FLAGS
+            if factor == 1
+            or (
+                math.ceil(native_width / factor) >= width
+                and math.ceil(native_height / factor) >= height
+            )
+        )
+
+    def __read_resized_image(
+        self, size: Optional[tuple[int, int]], grayscale: bool, interpolation: int
+    ) -> NDArray[Shape["*, *, ..."], UInt8]:
+        factor = self.__get_reduction_factor(size)
+        image = cv2.imread(str(self.path), REDUCED_READ_FLAGS[factor][grayscale])
+        if image is None:
+            return image
+        if size is not None and (image.shape[1], image.shape[0]) != tuple(size):
+            image = cv2.resize(image, tuple(size), interpolation=interpolation)
+        if self.cache is not None:
+            image.setflags(write=False)
+        return image
@@ -12,11 +12,53 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import cv2
+import math
+import numpy as np
 import open3d as o3d
 
-from dataclasses import dataclass
-from nptyping import Float, NDArray, Shape
+from dataclasses import dataclass, field
+from functools import lru_cache
+from nptyping import Float, Float64, NDArray, Shape
 from pathlib import Path
+from typing import Optional
+
+from vprdb.providers.provider_cache import point_cloud_size, ProviderCache
+from vprdb.providers.utils import transform_points
+
+
+@lru_cache(maxsize=16)
+def __calculate_pixels_offsets(
+    cx: float, cy: float, height: int, width: int, stride: int
+) -> NDArray[Shape["*, *, 2"], Float64]:
+    u = np.arange(0, width, stride, dtype=np.float64)
+    v = np.arange(0, height, stride, dtype=np.float64)
+    offsets = np.empty((len(v), len(u), 2), dtype=np.float64)
+    offsets[:, :, 0] = (u - cx)[np.newaxis, :]
+    offsets[:, :, 1] = (v - cy)[:, np.newaxis]
+    # The grid is shared between all callers
+    offsets.setflags(write=False)
+    return offsets
+
+
+def get_pixels_offsets(
+    intrinsics: NDArray[Shape["3, 3"], Float], height: int, width: int, stride: int = 1
+) -> NDArray[Shape["*, *, 2"], Float64]:
+    """
+    Calculates offsets of the pixels of the image from the principal point.
+    Grids are cached for each combination of principal point, resolution and stride
+    :param intrinsics: Intrinsic camera parameters
+    :param height: Height of the image
+    :param width: Width of the image
+    :param stride: Step between the pixels in both directions
+    :return: Read-only grid of offsets along X and Y axes
+    """
+    return __calculate_pixels_offsets(
+        float(intrinsics[0, 2]),
+        float(intrinsics[1, 2]),
+        height,
+        width,
+        stride,
+    )
 
 
 @dataclass(frozen=True)
@@ -29,10 +71,101 @@ class DepthImageProvider:
     """Intrinsic camera parameters"""
     depth_scale: int
     """Depth scale for transforming depth"""
+    cache: Optional[ProviderCache] = field(default=None, compare=False, repr=False)
+    """Optional cache shared by providers"""
 
     @property
     def point_cloud(self) -> o3d.geometry.PointCloud:
         """Returns Open3D point cloud constructed from depth image"""
+        if self.cache is None:
+            return self.__read_point_cloud()
+        cached_point_cloud = self.cache.get(
+            self.__cache_key("point_cloud"),
+            self.__read_point_cloud,
+            point_cloud_size,
+        )
+        # Callers can transform the point cloud in place, so the copy is returned
+        return o3d.geometry.PointCloud(cached_point_cloud)
+
+    def __cache_key(self, *data_description) -> tuple:
+        # Providers with different calibration of the same file can share the cache
+        intrinsics = tuple(
+            np.asarray(self.intrinsics, dtype=np.float64).ravel().tolist()
+        )
+        return *data_description, self.path, intrinsics, self.depth_scale
+
+    @property
+    def points(self) -> NDArray[Shape["*, 3"], Float64]:
+        """
+        Returns points of the depth image in the camera coordinate system.
+        Open3D point cloud is not constructed.
+        If the cache is used, the array is read-only
+        """
+        return self.get_points()
+
+    def points_world(
+        self, pose: NDArray[Shape["4, 4"], Float]
+    ) -> NDArray[Shape["*, 3"], Float64]:
+        """
+        Transforms points of the depth image to the world coordinate system
+        :param pose: Pose of the frame
+        :return: Transformed points
+        """
+        return transform_points(self.points, pose)
+
+    def get_points(
+        self, stride: int = 1, max_points: Optional[int] = None
+    ) -> NDArray[Shape["*, 3"], Float64]:
+        """
+        Back-projects the depth image without constructing Open3D point cloud.
+        Pixels with zero depth are skipped as in the point_cloud property
+        :param stride: Step between the used pixels in both directions
+        :param max_points: Maximum number of points. If given, the stride is increased
+        until the number of used pixels doesn't exceed this value
+        :return: Points in the camera coordinate system.
+        If the cache is used, the array is read-only
+        """
+        if stride < 1:
+            raise ValueError("Stride must be positive")
+        if max_points is not None and max_points < 1:
+            raise ValueError("Maximum number of points must be positive")
+        if self.cache is None:
+            return self.__read_points(stride, max_points)
+        return self.cache.get(
+            self.__cache_key("points", stride, max_points),
+            lambda: self.__read_points(stride, max_points),
+            lambda points: points.nbytes,
+        )
+
+    def __read_points(
+        self, stride: int, max_points: Optional[int]
+    ) -> NDArray[Shape["*, 3"], Float64]:
+        depth_image = cv2.imread(str(self.path), cv2.IMREAD_ANYDEPTH)
+        height, width = depth_image.shape
+        if max_points is not None:
+            stride = max(stride, math.ceil(math.sqrt(height * width / max_points)))
+            while math.ceil(height / stride) * math.ceil(width / stride) > max_points:
+                stride += 1
+
+        offsets = get_pixels_offsets(self.intrinsics, height, width, stride)
+        depth_image = depth_image[::stride, ::stride].ravel()
+        valid_pixels = np.flatnonzero(depth_image)
+        # Calculations repeat the ones of Open3D, so the points are exactly the same
+        # as in the point_cloud property: depth is converted to float32
+        # and coordinates are calculated in float64
+        depths = (depth_image[valid_pixels] / self.depth_scale).astype(np.float32)
+        depths = depths.astype(np.float64)
+        focal_lengths = np.asarray(self.intrinsics, dtype=np.float64)[[0, 1], [0, 1]]
+        points = np.empty((len(valid_pixels), 3), dtype=np.float64)
+        points[:, :2] = np.take(offsets.reshape(-1, 2), valid_pixels, axis=0)
+        points[:, :2] *= depths[:, np.newaxis]
+        points[:, :2] /= focal_lengths
+        points[:, 2] = depths
+        if self.cache is not None:
+            points.setflags(write=False)
+        return points
+
+    def __read_point_cloud(self) -> o3d.geometry.PointCloud:
         depth_image = cv2.imread(str(self.path), cv2.IMREAD_ANYDEPTH)
         height, width = depth_image.shape
         depth_image = o3d.geometry.Image(depth_image)
@@ -0,0 +1,107 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+
+from nptyping import Float32, NDArray, Shape
+from pathlib import Path
+from typing import Optional
+
+PCD_TYPES = {"F": "f", "I": "i", "U": "u"}
+
+
+def __read_header(path: Path) -> tuple[dict[str, list[str]], int]:
+    header = dict()
+    with open(path, "rb") as file:
+        while True:
+            line = file.readline()
+            if not line:
+                raise ValueError("PCD header is not terminated: " + str(path))
+            line = line.decode("ascii", errors="replace").strip()
+            if not line or line.startswith("#"):
+                continue
+            key, *values = line.split()
+            header[key.upper()] = values
+            if key.upper() == "DATA":
+                return header, file.tell()
+
+
+def read_pcd_points(path: Path) -> Optional[NDArray[Shape["*, 3"], Float32]]:
+    """
+    Reads coordinates of points from ascii or binary PCD file.
+    Coordinates of binary files are memory-mapped without copying
+    if they are stored as consecutive 32-bit floats
+    :param path: Path to the PCD file
+    :return: Read-only array of points or None if the file can't be read this way,
+    e.g. if it is compressed
+    """
+    header, data_offset = __read_header(path)
+    fields = header.get("FIELDS", [])
+    if not all(axis in fields for axis in "xyz"):
+        return None
+    sizes = [int(size) for size in header.get("SIZE", [])]
+    types = header.get("TYPE", [])
+    counts = [int(count) for count in header.get("COUNT", ["1"] * len(fields))]
+    if not len(fields) == len(sizes) == len(types) == len(counts):
+        return None
+    if any(type_ not in PCD_TYPES for type_ in types):
+        return None
+    xyz_fields = [fields.index(axis) for axis in "xyz"]
+    if any(types[i] != "F" or counts[i] != 1 for i in xyz_fields):
+        return None
+    if "POINTS" in header:
+        num_points = int(header["POINTS"][0])
+    else:
+        num_points = int(header["WIDTH"][0]) * int(header["HEIGHT"][0])
+    if num_points == 0:
+        return np.empty((0, 3), dtype=np.float32)
+
+    data_type = header["DATA"][0].lower()
+    if data_type == "ascii":
+        columns = np.cumsum([0] + counts)[xyz_fields]
+        with open(path, "rb") as file:
+            file.seek(data_offset)
+            points = np.loadtxt(
+                file, dtype=np.float32, usecols=columns, max_rows=num_points, ndmin=2
+            )
+        points.setflags(write=False)
+        return points
+    if data_type != "binary":
+        return None
+
+    # Field names can repeat in PCD files, e.g. padding fields "_"
+    record_type = np.dtype(
+        [
+            (str(i), f"<{PCD_TYPES[type_]}{size}", (count,) if count > 1 else ())
+            for i, (type_, size, count) in enumerate(zip(types, sizes, counts))
+        ]
+    )
+    records = np.memmap(
+        path, dtype=record_type, mode="r", offset=data_offset, shape=(num_points,)
+    )
+    offsets = [record_type.fields[str(i)][1] for i in xyz_fields]
+    if [sizes[i] for i in xyz_fields] == [4, 4, 4] and offsets == [
+        offsets[0],
+        offsets[0] + 4,
+        offsets[0] + 8,
+    ]:
+        return np.ndarray(
+            (num_points, 3),
+            dtype=np.float32,
+            buffer=records,
+            offset=offsets[0],
+            strides=(record_type.itemsize, 4),
+        )
+    points = np.column_stack([records[str(i)] for i in xyz_fields]).astype(np.float32)
+    points.setflags(write=False)
+    return points
@@ -11,10 +11,17 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import numpy as np
 import open3d as o3d
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from nptyping import Float, Float32, Float64, NDArray, Shape
 from pathlib import Path
+from typing import Optional
+
+from vprdb.providers.pcd_reader import read_pcd_points
+from vprdb.providers.provider_cache import point_cloud_size, ProviderCache
+from vprdb.providers.utils import transform_points
 
 
 @dataclass(frozen=True)
@@ -24,7 +31,56 @@ class PointCloudProvider:
     path: Path
     """Path to the file on the hard drive"""
 
+    cache: Optional[ProviderCache] = field(default=None, compare=False, repr=False)
+    """Optional cache shared by providers"""
+
     @property
     def point_cloud(self) -> o3d.geometry.PointCloud:
         """Returns Open3D point cloud"""
+        if self.cache is None:
+            return self.__read_point_cloud()
+        cached_point_cloud = self.cache.get(
+            ("point_cloud", self.path),
+            self.__read_point_cloud,
+            point_cloud_size,
+        )
+        # Callers can transform the point cloud in place, so the copy is returned
+        return o3d.geometry.PointCloud(cached_point_cloud)
+
+    @property
+    def points(self) -> NDArray[Shape["*, 3"], Float32]:
+        """
+        Returns points of the point cloud without constructing Open3D point cloud.
+        Points of PCD files are memory-mapped if possible, so the array can be read-only
+        """
+        if self.cache is None:
+            return self.__read_points()
+        return self.cache.get(
+            ("points", self.path),
+            self.__read_points,
+            lambda points: points.nbytes,
+        )
+
+    def points_world(
+        self, pose: NDArray[Shape["4, 4"], Float]
+    ) -> NDArray[Shape["*, 3"], Float64]:
+        """
+        Transforms points of the point cloud to the world coordinate system
+        :param pose: Pose of the frame
+        :return: Transformed points
+        """
+        return transform_points(self.points, pose)
+
+    def __read_point_cloud(self) -> o3d.geometry.PointCloud:
         return o3d.io.read_point_cloud(str(self.path))
+
+    def __read_points(self) -> NDArray[Shape["*, 3"], Float32]:
+        if self.path.suffix.lower() == ".pcd":
+            points = read_pcd_points(self.path)
+            if points is not None:
+                return points
+        # Other formats are read with Open3D
+        points = np.asarray(self.__read_point_cloud().points, dtype=np.float32)
+        if self.cache is not None:
+            points.setflags(write=False)
+        return points
@@ -0,0 +1,102 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+import open3d as o3d
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+def point_cloud_size(point_cloud: o3d.geometry.PointCloud) -> int:
+    """
+    Calculates the size of the point cloud data
+    :param point_cloud: Point cloud
+    :return: Size in bytes
+    """
+    return sum(
+        np.asarray(attribute).nbytes
+        for attribute in (point_cloud.points, point_cloud.colors, point_cloud.normals)
+    )
+
+
+class ProviderCache:
+    """
+    LRU cache for the data loaded by providers.
+    The least recently used entries are evicted when the total size
+    of the cached data exceeds the given budget
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Constructs empty cache
+        :param max_bytes: Maximum total size of the cached data in bytes
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        """Number of requests served from the cache"""
+        self.misses = 0
+        """Number of requests that required loading the data"""
+        self.current_bytes = 0
+        """Total size of the cached data in bytes"""
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        size_of: Callable[[Any], int],
+    ) -> Any:
+        """
+        Gets the data from the cache or loads it
+        :param key: Key of the data
+        :param loader: Function for loading the data in case of a cache miss
+        :param size_of: Function for calculating the size of the data in bytes
+        :return: Cached data. It is shared between all callers, so it must not be modified
+        """
+        with self.__lock:
+            if key in self.__entries:
+                self.hits += 1
+                self.__entries.move_to_end(key)
+                return self.__entries[key][0]
+            self.misses += 1
+
+        # The data is loaded without the lock, so other threads are not blocked
+        value = loader()
+        size = size_of(value)
+        if size > self.max_bytes:
+            return value
+
+        with self.__lock:
+            if key not in self.__entries:
+                self.__entries[key] = (value, size)
+                self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.__entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+            return self.__entries[key][0] if key in self.__entries else value
+
+    def clear(self):
+        """Removes all entries from the cache"""
+        with self.__lock:
+            self.__entries.clear()
+            self.current_bytes = 0
+
+    def __getstate__(self):
+        # Each process gets its own empty cache with the same budget
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
@@ -0,0 +1,33 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import numpy as np
+
+from nptyping import Float, Float64, NDArray, Shape
+
+
+def transform_points(
+    points: NDArray[Shape["*, 3"], Float], pose: NDArray[Shape["4, 4"], Float]
+) -> NDArray[Shape["*, 3"], Float64]:
+    """
+    Applies the transformation to the points with a single matrix multiplication.
+    The result is calculated in double precision,
+    so world coordinates far from the origin are not rounded
+    :param points: Points for transformation
+    :param pose: Transformation matrix
+    :return: Transformed points
+    """
+    pose = np.asarray(pose, dtype=np.float64)
+    transformed_points = points @ pose[:3, :3].T
+    transformed_points += pose[:3, 3]
+    return transformed_points
@@ -13,8 +13,45 @@
 #  limitations under the License.
 import numpy as np
 
+from nptyping import Float, NDArray, Shape
+from typing import Optional
+
 from vprdb.core import Database
+from vprdb.providers import ColorImageProvider, DepthImageProvider, PointCloudProvider
 from vprdb.reduction_methods.reduction_method import ReductionMethod
+from vprdb.reduction_methods.reduction_stream import KeptFramesStream, ReductionStream
+
+
+class DistanceVectorStream(KeptFramesStream):
+    """Stream implementation of DistanceVector method"""
+
+    def __init__(self, distance_threshold: float):
+        super().__init__()
+        self.distance_threshold = distance_threshold
+        self.last_position = None
+        self.partial_distance = 0
+
+    def add_frame(
+        self,
+        color_image: ColorImageProvider,
+        point_cloud: DepthImageProvider | PointCloudProvider,
+        pose: NDArray[Shape["4, 4"], Float],
+    ) -> Optional[bool]:
+        position = np.asarray(pose)[:3, 3]
+        if self.last_position is None:
+            is_kept = True
+        else:
+            # Row-wise norm gives the same rounding as in the batch method
+            distance = np.linalg.norm([position - self.last_position], axis=1)[0]
+            self.partial_distance += distance
+            is_kept = self.partial_distance > self.distance_threshold
+        self.last_position = position
+        if is_kept:
+            self.keep_frame(color_image, point_cloud, pose)
+            self.partial_distance = 0
+        return is_kept
+
+    add_frame.__doc__ = ReductionStream.add_frame.__doc__
 
 
 class DistanceVector(ReductionMethod):
@@ -32,10 +69,8 @@ class DistanceVector(ReductionMethod):
         self.distance_threshold = distance_threshold
 
     def reduce(self, db: Database) -> Database:
-        traj = np.asarray(db.trajectory)
-        new_traj = [traj[0]]
-        new_color = [db.color_images[0]]
-        new_point_clouds = [db.point_clouds[0]]
+        traj = db.trajectory
+        res_indices = [0]
         first_points = traj[:-1, :3, 3]
         last_points = traj[1:, :3, 3]
         distances = np.linalg.norm(last_points - first_points, axis=1)
@@ -43,11 +78,14 @@ class DistanceVector(ReductionMethod):
         for i, cur_distance in enumerate(distances):
             partial_distance += cur_distance
             if partial_distance > self.distance_threshold:
-                new_traj.append(traj[i + 1])
-                new_color.append(db.color_images[i + 1])
-                new_point_clouds.append(db.point_clouds[i + 1])
+                res_indices.append(i + 1)
                 partial_distance = 0
 
-        return Database(new_color, new_point_clouds, new_traj)
+        return db.subset(res_indices)
 
     reduce.__doc__ = ReductionMethod.reduce.__doc__
+
+    def create_stream(self) -> ReductionStream:
+        return DistanceVectorStream(self.distance_threshold)
+
+    create_stream.__doc__ = ReductionMethod.create_stream.__doc__
@@ -11,10 +11,50 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-import networkx as nx
+import numpy as np
 
-from vprdb.core import Database, VoxelGrid
+from nptyping import Float, Int64, NDArray, Shape
+from scipy import sparse
+from typing import Optional
+
+from vprdb.core import calculate_overlap_matrix, Database, VoxelGrid
+from vprdb.providers import ColorImageProvider, DepthImageProvider, PointCloudProvider
+from vprdb.reduction_methods.greedy_dominating_set import greedy_dominating_set
 from vprdb.reduction_methods.reduction_method import ReductionMethod
+from vprdb.reduction_methods.reduction_stream import KeptFramesStream, ReductionStream
+
+
+class DominatingSetStream(KeptFramesStream):
+    """
+    Stream implementation of DominatingSet method.
+    Only voxel keys of each frame are stored, the dominating set is found on finalization
+    """
+
+    def __init__(self, method: "DominatingSet"):
+        super().__init__()
+        self.method = method
+        self.voxel_grid = VoxelGrid.from_origin(method.voxel_size)
+        self.frames_voxels = []
+
+    def add_frame(
+        self,
+        color_image: ColorImageProvider,
+        point_cloud: DepthImageProvider | PointCloudProvider,
+        pose: NDArray[Shape["4, 4"], Float],
+    ) -> Optional[bool]:
+        self.keep_frame(color_image, point_cloud, pose)
+        self.frames_voxels.append(
+            self.voxel_grid.get_occupied_voxels(point_cloud.points_world(pose))
+        )
+        return None
+
+    add_frame.__doc__ = ReductionStream.add_frame.__doc__
+
+    def finalize(self) -> Database:
+        result_indices = self.method.find_dominating_frames(self.frames_voxels)
+        return super().finalize().subset(result_indices)
+
+    finalize.__doc__ = ReductionStream.finalize.__doc__
 
 
 class DominatingSet(ReductionMethod):
@@ -26,61 +66,73 @@ class DominatingSet(ReductionMethod):
     vertex from it.
     """
 
-    def __init__(self, threshold: float = 0.3, voxel_size: float = 0.3):
+    def __init__(
+        self,
+        threshold: float = 0.3,
+        voxel_size: float = 0.3,
+        weighting: str = "coverage",
+        anchor_at_origin: bool = False,
+    ):
         """
         Constructs DominatingSet reduction method
         :param threshold: Threshold value for IoU
         :param voxel_size: The value indicating which IoU value will be enough
         to consider the point clouds as overlapping
+        :param weighting: Greedy strategy for finding the dominating set,
+        "coverage" or "degree"
+        :param anchor_at_origin: Whether to anchor the voxel grid at the origin
+        instead of the scene bounds. It is required for the streaming reduction,
+        because the bounds of the scene are unknown in advance
         """
         self.threshold = threshold
         self.voxel_size = voxel_size
+        self.weighting = weighting
+        self.anchor_at_origin = anchor_at_origin
 
-    def reduce(self, db: Database) -> Database:
-        min_bounds, max_bounds = db.bounds
-        voxel_grid = VoxelGrid(min_bounds, max_bounds, self.voxel_size)
-        # Determine which frames cover a particular voxel
-        voxel_to_frames_dict = dict()
-        # Frame size is the number of voxels it covers
-        frames_sizes = []
-        for i, pose in enumerate(db.trajectory):
-            pcd = db.point_clouds[i].point_cloud.transform(pose)
-            down_sampled_pcd = voxel_grid.voxel_down_sample(pcd)
-            points = down_sampled_pcd.points
-            frames_sizes.append(len(points))
-            for point in points:
-                voxel_index = voxel_grid.get_voxel_index(point)
-                if voxel_index in voxel_to_frames_dict:
-                    voxel_to_frames_dict[voxel_index].append(i)
-                else:
-                    voxel_to_frames_dict[voxel_index] = [i]
-
-        intersections = dict()
-        for covering_frames in voxel_to_frames_dict.values():
-            for i, frame_1 in enumerate(covering_frames):
-                for frame_2 in covering_frames[i + 1 :]:
-                    intersection = tuple(sorted((frame_1, frame_2)))
-                    if intersection in intersections:
-                        intersections[intersection] += 1
-                    else:
-                        intersections[intersection] = 1
-
-        IoUs = dict.fromkeys(intersections.keys())
-        for (frame_1, frame_2), intersection in intersections.items():
-            IoUs[(frame_1, frame_2)] = intersection / (
-                frames_sizes[frame_1] + frames_sizes[frame_2] - intersection
-            )
+    def find_dominating_frames(
+        self, frames_voxels: list[NDArray[Shape["*"], Int64]]
+    ) -> list[int]:
+        """
+        Finds frames of the dominating set by voxels occupied by frames
+        :param frames_voxels: Sorted voxel keys for each frame
+        :return: Indices of frames from the dominating set
+        """
+        intersections, frames_sizes, _ = calculate_overlap_matrix(frames_voxels)
+        # Each pair of frames is considered once
+        intersections = sparse.triu(intersections, k=1).tocoo()
+        frames_1, frames_2 = intersections.row, intersections.col
+        IoUs = intersections.data / (
+            frames_sizes[frames_1] + frames_sizes[frames_2] - intersections.data
+        )
+        edges_mask = IoUs > self.threshold
 
-        G = nx.Graph()
-        G.add_nodes_from(range(len(db)))
-        for (fr1, fr2), IoU in IoUs.items():
-            if IoU > self.threshold:
-                G.add_edge(fr1, fr2)
-        result_indices = list(nx.dominating_set(G))
-        result_indices.sort()
-        new_rgb = [db.color_images[i] for i in result_indices]
-        new_point_clouds = [db.point_clouds[i] for i in result_indices]
-        new_traj = [db.trajectory[i] for i in result_indices]
-        return Database(new_rgb, new_point_clouds, new_traj)
+        num_of_frames = len(frames_voxels)
+        edges = sparse.coo_matrix(
+            (
+                np.ones(np.count_nonzero(edges_mask), dtype=np.int8),
+                (frames_1[edges_mask], frames_2[edges_mask]),
+            ),
+            shape=(num_of_frames, num_of_frames),
+        )
+        adjacency = (edges + edges.T).tocsr()
+        return greedy_dominating_set(adjacency, self.weighting)
+
+    def reduce(self, db: Database) -> Database:
+        if self.anchor_at_origin:
+            voxel_grid = VoxelGrid.from_origin(self.voxel_size)
+        else:
+            min_bounds, max_bounds = db.bounds
+            voxel_grid = VoxelGrid(min_bounds, max_bounds, self.voxel_size)
+        result_indices = self.find_dominating_frames(db.get_voxel_keys(voxel_grid))
+        return db.subset(result_indices)
 
     reduce.__doc__ = ReductionMethod.reduce.__doc__
+
+    def create_stream(self) -> ReductionStream:
+        if not self.anchor_at_origin:
+            raise ValueError(
+                "Streaming reduction requires the voxel grid anchored at the origin"
+            )
+        return DominatingSetStream(self)
+
+    create_stream.__doc__ = ReductionMethod.create_stream.__doc__
@@ -11,8 +11,38 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import numpy as np
+
+from nptyping import Float, NDArray, Shape
+from typing import Optional
+
 from vprdb.core import Database
+from vprdb.providers import ColorImageProvider, DepthImageProvider, PointCloudProvider
 from vprdb.reduction_methods.reduction_method import ReductionMethod
+from vprdb.reduction_methods.reduction_stream import KeptFramesStream, ReductionStream
+
+
+class EveryNthStream(KeptFramesStream):
+    """Stream implementation of EveryNth method"""
+
+    def __init__(self, n: int):
+        super().__init__()
+        self.n = n
+        self.frames_count = 0
+
+    def add_frame(
+        self,
+        color_image: ColorImageProvider,
+        point_cloud: DepthImageProvider | PointCloudProvider,
+        pose: NDArray[Shape["4, 4"], Float],
+    ) -> Optional[bool]:
+        is_kept = self.frames_count % self.n == 0
+        if is_kept:
+            self.keep_frame(color_image, point_cloud, pose)
+        self.frames_count += 1
+        return is_kept
+
+    add_frame.__doc__ = ReductionStream.add_frame.__doc__
 
 
 class EveryNth(ReductionMethod):
@@ -26,9 +56,11 @@ class EveryNth(ReductionMethod):
         self.n = n
 
     def reduce(self, db: Database) -> Database:
-        new_traj = db.trajectory[:: self.n]
-        new_color = db.color_images[:: self.n]
-        new_point_clouds = db.point_clouds[:: self.n]
-        return Database(new_color, new_point_clouds, new_traj)
+        return db.subset(np.arange(0, len(db), self.n))
 
     reduce.__doc__ = ReductionMethod.reduce.__doc__
+
+    def create_stream(self) -> ReductionStream:
+        return EveryNthStream(self.n)
+
+    create_stream.__doc__ = ReductionMethod.create_stream.__doc__
@@ -0,0 +1,71 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import heapq
+import numpy as np
+
+from scipy import sparse
+
+
+def greedy_dominating_set(
+    adjacency: sparse.csr_matrix, weighting: str = "coverage"
+) -> list[int]:
+    """
+    Finds a dominating set of the graph with greedy algorithm.
+    Vertices are chosen with a lazy priority queue, so the gain of a vertex
+    is recalculated only when it reaches the top of the queue.
+    The queue is ordered by gains and then by indices of vertices,
+    so the result is reproducible
+    :param adjacency: Symmetric adjacency matrix of the graph
+    :param weighting: "coverage" chooses the vertex dominating the largest number of
+    not yet dominated vertices, "degree" processes vertices in order of descending degree
+    and chooses a vertex if it dominates at least one new vertex
+    :return: Sorted indices of vertices from the dominating set
+    """
+    if weighting not in ("coverage", "degree"):
+        raise ValueError("Unknown weighting: " + weighting)
+
+    adjacency = sparse.csr_matrix(adjacency)
+    num_vertices = adjacency.shape[0]
+    indptr, indices = adjacency.indptr, adjacency.indices
+    dominated = np.zeros(num_vertices, dtype=bool)
+    num_dominated = 0
+
+    def closed_neighborhood(vertex):
+        neighbors = indices[indptr[vertex] : indptr[vertex + 1]]
+        return np.append(neighbors[neighbors != vertex], vertex)
+
+    def count_gain(vertex):
+        return int(np.count_nonzero(~dominated[closed_neighborhood(vertex)]))
+
+    degrees = np.diff(indptr)
+    queue = [(-(degree + 1), vertex) for vertex, degree in enumerate(degrees.tolist())]
+    heapq.heapify(queue)
+
+    result = []
+    while num_dominated < num_vertices:
+        priority, vertex = heapq.heappop(queue)
+        gain = count_gain(vertex)
+        if gain == 0:
+            continue
+        if weighting == "coverage" and gain != -priority:
+            # Gains can only decrease, so the stale value is pushed back
+            heapq.heappush(queue, (-gain, vertex))
+            continue
+        neighborhood = closed_neighborhood(vertex)
+        num_dominated += gain
+        dominated[neighborhood] = True
+        result.append(vertex)
+
+    result.sort()
+    return result
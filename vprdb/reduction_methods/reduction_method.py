@@ -14,6 +14,7 @@
 from abc import ABC, abstractmethod
 
 from vprdb.core import Database
+from vprdb.reduction_methods.reduction_stream import ReductionStream
 
 
 class ReductionMethod(ABC):
@@ -29,3 +30,15 @@ class ReductionMethod(ABC):
         :return: Reduced database
         """
         pass
+
+    def create_stream(self) -> ReductionStream:
+        """
+        Creates a stream for reducing frames incrementally,
+        without materializing the whole Database in advance.
+        Methods depending on the whole trajectory, e.g. CubeDivision,
+        don't support streaming
+        :return: Reduction stream
+        """
+        raise NotImplementedError(
+            "{} doesn't support streaming".format(type(self).__name__)
+        )
@@ -0,0 +1,90 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from abc import ABC, abstractmethod
+from nptyping import Float, NDArray, Shape
+from typing import Optional
+
+from vprdb.core import Database
+from vprdb.providers import ColorImageProvider, DepthImageProvider, PointCloudProvider
+
+
+class ReductionStream(ABC):
+    """
+    A class to represent incremental reduction of frames
+    arriving one by one, e.g. during the mapping session.
+    EveryNth and DistanceVector decide on each frame immediately,
+    DominatingSet keeps only voxel keys of frames and decides on finalization
+    """
+
+    @abstractmethod
+    def add_frame(
+        self,
+        color_image: ColorImageProvider,
+        point_cloud: DepthImageProvider | PointCloudProvider,
+        pose: NDArray[Shape["4, 4"], Float],
+    ) -> Optional[bool]:
+        """
+        Adds the next frame to the stream
+        :param color_image: Color image of the frame
+        :param point_cloud: Point cloud of the frame
+        :param pose: Pose of the frame
+        :return: True if the frame is kept, False if it is dropped
+        and None if the decision can only be made after finalization
+        """
+        pass
+
+    def add_frames(self, db: Database) -> list[Optional[bool]]:
+        """
+        Adds a chunk of frames to the stream
+        :param db: Database with the next frames
+        :return: Decisions for each frame of the chunk
+        """
+        return [
+            self.add_frame(color_image, point_cloud, pose)
+            for color_image, point_cloud, pose in zip(
+                db.color_images, db.point_clouds, db.trajectory
+            )
+        ]
+
+    @abstractmethod
+    def finalize(self) -> Database:
+        """
+        Finishes the reduction
+        :return: Reduced database, the same as the result of batch reduction
+        """
+        pass
+
+
+class KeptFramesStream(ReductionStream, ABC):
+    """Stream that makes final decisions immediately and stores only kept frames"""
+
+    def __init__(self):
+        self.color_images = []
+        self.point_clouds = []
+        self.trajectory = []
+
+    def keep_frame(
+        self,
+        color_image: ColorImageProvider,
+        point_cloud: DepthImageProvider | PointCloudProvider,
+        pose: NDArray[Shape["4, 4"], Float],
+    ):
+        self.color_images.append(color_image)
+        self.point_clouds.append(point_cloud)
+        self.trajectory.append(pose)
+
+    def finalize(self) -> Database:
+        return Database(self.color_images, self.point_clouds, self.trajectory)
+
+    finalize.__doc__ = ReductionStream.finalize.__doc__
@@ -13,7 +13,8 @@
 #  limitations under the License.
 """ The `vpr_systems` contains a set of tools for the VPR task. """
 from vprdb.vpr_systems.cos_place import CosPlace
+from vprdb.vpr_systems.descriptor_store import DescriptorStore
 from vprdb.vpr_systems.netvlad import NetVLAD
 from vprdb.vpr_systems.superglue import SuperGlue
 
-__all__ = ["CosPlace", "NetVLAD", "SuperGlue"]
+__all__ = ["CosPlace", "DescriptorStore", "NetVLAD", "SuperGlue"]
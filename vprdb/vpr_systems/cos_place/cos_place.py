@@ -11,14 +11,17 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-import cv2
 import numpy as np
+import os
 import torch
-import torchvision
 
+from nptyping import Float32, NDArray, Shape
+from pathlib import Path
 from pytorch_lightning import Trainer
 from pytorch_lightning.callbacks import EarlyStopping, ModelCheckpoint
+from torch.utils.data import DataLoader
 from tqdm import tqdm
+from typing import Optional
 
 from vprdb.core import (
     Database,
@@ -32,7 +35,9 @@ from vprdb.vpr_systems.cos_place.training import (
     create_groups,
     DataModule,
 )
-from vprdb.vpr_systems.utils import make_deterministic
+from vprdb.vpr_systems.descriptor_store import DescriptorStore
+from vprdb.vpr_systems.netvlad.i_dataset import IDataset
+from vprdb.vpr_systems.utils import make_deterministic, make_size_buckets
 
 
 class CosPlace:
@@ -40,48 +45,120 @@ class CosPlace:
     Implementation of [CosPlace](https://github.com/gmberton/CosPlace) global localization method.
     """
 
-    def __init__(self, backbone: str, fc_output_dim: int, path_to_weights: str):
+    def __init__(
+        self,
+        backbone: str,
+        fc_output_dim: int,
+        path_to_weights: str,
+        resize: Optional[tuple[int, int]] = None,
+        path_to_descriptor_store: Optional[Path] = None,
+    ):
+        """
+        Constructs CosPlace
+        :param backbone: Backbone of the model
+        :param fc_output_dim: Dimension of descriptors
+        :param path_to_weights: Path to the weights of the model
+        :param resize: Size of input images as (height, width).
+        If not given, images are used in their native size
+        :param path_to_descriptor_store: Directory of the store for reusing descriptors
+        between runs. If not given, descriptors are not stored
+        """
         self.backbone = backbone
         self.fc_output_dim = fc_output_dim
-        self.path_to_weights = path_to_weights
+        self.resize = resize
+        self.path_to_descriptor_store = path_to_descriptor_store
 
         self.model = GeoLocalizationNet(backbone, fc_output_dim)
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.load_weights(path_to_weights)
+
+    def load_weights(self, path_to_weights: str):
+        """
+        Loads weights into the model. Stored descriptors of other weights are not used
+        :param path_to_weights: Path to the weights of the model
+        """
+        self.path_to_weights = path_to_weights
         model_state_dict = torch.load(self.path_to_weights)
         self.model.load_state_dict(model_state_dict)
-
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
 
-    def get_database_descriptors(self, database: Database):
+        self.descriptor_store = None
+        if self.path_to_descriptor_store is not None:
+            self.descriptor_store = DescriptorStore(
+                self.path_to_descriptor_store,
+                self.path_to_weights,
+                {
+                    "method": "CosPlace",
+                    "backbone": self.backbone,
+                    "fc_output_dim": self.fc_output_dim,
+                    "resize": None if self.resize is None else list(self.resize),
+                },
+            )
+
+    def get_database_descriptors(
+        self,
+        database: Database,
+        batch_size: int = 16,
+        num_workers: int = min(4, os.cpu_count() or 1),
+        pin_memory: Optional[bool] = None,
+    ):
         """
-        Gets database RGB images CosPlace descriptors
+        Gets database RGB images CosPlace descriptors.
+        If the descriptor store is used, only images without stored descriptors are described
         :param database: Database for getting descriptors
+        :param batch_size: Number of images processed at once.
+        If resize is not given, images of different sizes are put into different batches
+        :param num_workers: Number of processes decoding images in the background.
+        If 0, images are decoded in the main process
+        :param pin_memory: Whether to use pinned memory for batches.
+        By default, it is used if CUDA is available
         :return: Descriptors for database images
         """
-        self.model.eval()
-        image_providers = database.color_images
-        with torch.no_grad():
-            all_descriptors = np.empty(
-                (len(image_providers), self.fc_output_dim), dtype="float32"
+        color_images_paths = [img.path for img in database.color_images]
+
+        def compute_descriptors(images: list[Path]):
+            return self.__compute_descriptors(
+                images, batch_size, num_workers, pin_memory
+            )
+
+        if self.descriptor_store is None:
+            return compute_descriptors(color_images_paths)
+        return self.descriptor_store.get_descriptors(
+            color_images_paths, compute_descriptors
+        )
+
+    def __compute_descriptors(
+        self,
+        color_images_paths: list[Path],
+        batch_size: int,
+        num_workers: int,
+        pin_memory: Optional[bool],
+    ) -> NDArray[Shape["*, *"], Float32]:
+        if pin_memory is None:
+            pin_memory = self.device.type == "cuda"
+        dataset = IDataset(color_images_paths, self.resize or (0, 0))
+        if self.resize is None:
+            # Images of different sizes can't be stacked into one batch
+            batching = dict(
+                batch_sampler=make_size_buckets(color_images_paths, batch_size)
             )
-            for i, image in tqdm(
-                enumerate(image_providers), total=len(image_providers)
-            ):
-                image_bgr = image.color_image
-                image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-                base_transform = torchvision.transforms.Compose(
-                    [
-                        torchvision.transforms.ToTensor(),
-                        torchvision.transforms.Normalize(
-                            mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]
-                        ),
-                    ]
-                )
-                normalized_img = base_transform(image_rgb)
-                normalized_img = normalized_img[None, :]
-                descriptor = self.model(normalized_img.to(self.device))
-                descriptor = descriptor.cpu().numpy()
-                all_descriptors[i] = descriptor
+        else:
+            batching = dict(batch_size=batch_size, shuffle=False)
+        data_loader = DataLoader(
+            dataset=dataset,
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            **batching,
+        )
+
+        self.model.eval()
+        all_descriptors = np.empty(
+            (len(color_images_paths), self.fc_output_dim), dtype="float32"
+        )
+        with torch.inference_mode():
+            for images, indices in tqdm(data_loader, total=len(data_loader)):
+                descriptors = self.model(images.to(self.device, non_blocking=True))
+                all_descriptors[indices.numpy()] = descriptors.cpu().numpy()
         return all_descriptors
 
     def fine_tune_model(
@@ -91,6 +168,7 @@ class CosPlace:
         train_db: Database,
         save_dir: str,
         voxel_size=0.3,
+        anchor_at_origin=False,
         random_resize=(480, 640),
         brightness=0.7,
         contrast=0.7,
@@ -106,18 +184,26 @@ class CosPlace:
         seed=0,
     ) -> str:
         """
-        Fine-tunes the CosPlace model for given target database
+        Fine-tunes the CosPlace model for given target database.
+        The best weights are loaded into the model after training
         :param target_db: The database for which the model will be fine-tuned
         :param valid_db: Validation database
         :param train_db: Training database
         :param save_dir: Directory for saving output model and log
         :param voxel_size: Voxel size for down sampling point clouds
+        :param anchor_at_origin: Whether to anchor the voxel grid at the origin
+        instead of the scene bounds. Bounds aren't calculated in this case,
+        but voxels are shifted relative to the bounds-anchored grid,
+        so the results may slightly differ
         :return: Path to output model
         """
-        min_bounds, max_bounds = find_bounds_for_multiple_databases(
-            [target_db, valid_db, train_db]
-        )
-        voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
+        if anchor_at_origin:
+            voxel_grid = VoxelGrid.from_origin(voxel_size)
+        else:
+            min_bounds, max_bounds = find_bounds_for_multiple_databases(
+                [target_db, valid_db, train_db]
+            )
+            voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
 
         groups = create_groups(train_db, target_db, voxel_grid)
         groups_lens = [len(group_db) for group_db, _ in groups]
@@ -177,4 +263,7 @@ class CosPlace:
         for k in model_state_dict.keys():
             new_model_state_dict[k[6:]] = model_state_dict[k]
         torch.save(new_model_state_dict, checkpoint_callback.best_model_path)
+        # The model is trained in place, so the best weights are loaded into it
+        # and the descriptor store is switched to them
+        self.load_weights(checkpoint_callback.best_model_path)
         return checkpoint_callback.best_model_path
@@ -11,7 +11,7 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from vprdb.core import calculate_iou, Database, match_two_databases, VoxelGrid
+from vprdb.core import calculate_voxels_iou, Database, match_two_databases, VoxelGrid
 
 
 def create_groups(train_database: Database, target_db: Database, voxel_grid: VoxelGrid):
@@ -23,6 +23,7 @@ def create_groups(train_database: Database, target_db: Database, voxel_grid: Vox
     for i, match in enumerate(train_database_matches):
         classes_dict[match].append(i)
 
+    target_voxels = target_db.get_voxel_keys(voxel_grid)
     classes = set(range(len(target_db)))
     groups = list()
     while len(classes) > 0:
@@ -30,17 +31,9 @@ def create_groups(train_database: Database, target_db: Database, voxel_grid: Vox
         for class_ in classes:
             available_to_add = True
             for inner_class in new_group:
-                pose, pcd = (
-                    target_db.trajectory[class_],
-                    target_db.point_clouds[class_],
+                iou = calculate_voxels_iou(
+                    target_voxels[class_], target_voxels[inner_class]
                 )
-                pose_inner, pcd_inner = (
-                    target_db.trajectory[inner_class],
-                    target_db.point_clouds[inner_class],
-                )
-                pcd_1 = pcd.point_cloud.transform(pose)
-                pcd_2 = pcd_inner.point_cloud.transform(pose_inner)
-                iou = calculate_iou(pcd_1, pcd_2, voxel_grid)
                 if iou > 0:
                     available_to_add = False
                     break
@@ -57,10 +50,7 @@ def create_groups(train_database: Database, target_db: Database, voxel_grid: Vox
         for class_ in group:
             train_group_indices.extend(classes_dict[class_])
             train_group_targets.extend([class_] * len(classes_dict[class_]))
-        train_group_rgb = [train_database.color_images[i] for i in train_group_indices]
-        train_group_pcds = [train_database.point_clouds[i] for i in train_group_indices]
-        train_group_traj = [train_database.trajectory[i] for i in train_group_indices]
-        train_group_db = Database(train_group_rgb, train_group_pcds, train_group_traj)
+        train_group_db = train_database.subset(train_group_indices)
         if len(train_group_db) > len(target_db):
             groups_with_images.append((train_group_db, train_group_targets))
     return groups_with_images
@@ -0,0 +1,199 @@
+#  Copyright (c) 2023, Ivan Moskalenko, Anastasiia Kornilova
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import hashlib
+import json
+import numpy as np
+import os
+
+from nptyping import Float32, Int64, NDArray, Shape
+from pathlib import Path
+from typing import Callable
+
+CONFIG_FILE_NAME = "config.json"
+INDEX_FILE_NAME = "index.jsonl"
+DESCRIPTORS_FILE_NAME = "descriptors.f32"
+
+
+def hash_file(path: Path) -> str:
+    """
+    Calculates SHA-256 hash of the file contents
+    :param path: Path to the file
+    :return: Hex digest of the hash
+    """
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class DescriptorStore:
+    """
+    Persistent store of global descriptors of images.
+    Descriptors computed with different weights or preprocessing
+    are kept in separate subdirectories of the store.
+    An image is identified by its path and modification time,
+    so changed images are described again.
+    Descriptors are appended to a memory-mapped array,
+    and the index of rows is appended to a JSON Lines file
+    """
+
+    def __init__(self, path: Path, path_to_weights: Path, config: dict):
+        """
+        Opens the store or creates an empty one
+        :param path: Root directory of the store
+        :param path_to_weights: Path to the weights of the model computing descriptors
+        :param config: JSON-serializable preprocessing and model parameters
+        affecting descriptors
+        """
+        self.config = {"weights": hash_file(path_to_weights), **config}
+        key = hashlib.sha256(
+            json.dumps(self.config, sort_keys=True).encode()
+        ).hexdigest()
+        self.path = Path(path) / key[:16]
+        self.path.mkdir(parents=True, exist_ok=True)
+        path_to_config = self.path / CONFIG_FILE_NAME
+        if not path_to_config.exists():
+            with open(path_to_config, "w") as config_file:
+                json.dump(self.config, config_file, indent=2)
+
+        self.dim = None
+        self.__rows = dict()
+        self.__num_rows = 0
+        self.__descriptors = None
+        self.__load_index()
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def __load_index(self):
+        path_to_index = self.path / INDEX_FILE_NAME
+        if not path_to_index.exists():
+            return
+        with open(path_to_index, "r") as index_file:
+            lines = index_file.read().splitlines()
+        if len(lines) == 0:
+            return
+        self.dim = json.loads(lines[0])["dim"]
+        # Rows are written before the index, so an interrupted write
+        # leaves only a tail of rows that are not indexed
+        path_to_descriptors = self.path / DESCRIPTORS_FILE_NAME
+        stored_rows = (
+            os.path.getsize(path_to_descriptors) // (4 * self.dim)
+            if path_to_descriptors.exists()
+            else 0
+        )
+        num_lines = 1
+        for line in lines[1:]:
+            try:
+                image_path, mtime, row = json.loads(line)
+            except ValueError:
+                break
+            if row >= stored_rows:
+                break
+            self.__rows[image_path] = (mtime, row)
+            self.__num_rows = row + 1
+            num_lines += 1
+        if num_lines < len(lines):
+            with open(path_to_index, "w") as index_file:
+                index_file.write("\n".join(lines[:num_lines]) + "\n")
+
+    @staticmethod
+    def __identify(image_path: Path) -> tuple[str, int]:
+        return os.path.abspath(image_path), os.stat(image_path).st_mtime_ns
+
+    @property
+    def descriptors(self) -> NDArray[Shape["*, *"], Float32]:
+        """Memory-mapped array of all stored descriptors"""
+        if self.__descriptors is None:
+            if self.__num_rows == 0:
+                return np.empty((0, self.dim or 0), dtype=np.float32)
+            self.__descriptors = np.memmap(
+                self.path / DESCRIPTORS_FILE_NAME,
+                dtype=np.float32,
+                mode="r",
+                shape=(self.__num_rows, self.dim),
+            )
+        return self.__descriptors
+
+    def find(self, images: list[Path]) -> NDArray[Shape["*"], Int64]:
+        """
+        Finds stored descriptors of the images
+        :param images: Paths to images
+        :return: Rows of the descriptors or -1 for images without actual descriptors
+        """
+        rows = np.full(len(images), -1, dtype=np.int64)
+        for i, image_path in enumerate(images):
+            image_path, mtime = self.__identify(image_path)
+            stored = self.__rows.get(image_path)
+            if stored is not None and stored[0] == mtime:
+                rows[i] = stored[1]
+        return rows
+
+    def add(
+        self, images: list[Path], descriptors: NDArray[Shape["*, *"], Float32]
+    ) -> NDArray[Shape["*"], Int64]:
+        """
+        Appends descriptors of the images to the store
+        :param images: Paths to images
+        :param descriptors: Descriptors of the images
+        :return: Rows of the added descriptors
+        """
+        descriptors = np.ascontiguousarray(descriptors, dtype=np.float32)
+        if len(images) != len(descriptors):
+            raise ValueError("Number of images and descriptors must be the same")
+        if self.dim is None:
+            self.dim = descriptors.shape[1]
+            with open(self.path / INDEX_FILE_NAME, "w") as index_file:
+                index_file.write(json.dumps({"dim": self.dim}) + "\n")
+        elif descriptors.shape[1] != self.dim:
+            raise ValueError(
+                f"Descriptors of size {descriptors.shape[1]} can't be added "
+                f"to the store of size {self.dim}"
+            )
+
+        rows = np.arange(self.__num_rows, self.__num_rows + len(descriptors))
+        with open(self.path / DESCRIPTORS_FILE_NAME, "ab") as descriptors_file:
+            # Rows that were not indexed are overwritten
+            descriptors_file.truncate(self.__num_rows * 4 * self.dim)
+            descriptors_file.write(descriptors.tobytes())
+        lines = []
+        for image_path, row in zip(images, rows.tolist()):
+            image_path, mtime = self.__identify(image_path)
+            self.__rows[image_path] = (mtime, row)
+            lines.append(json.dumps([image_path, mtime, row]) + "\n")
+        with open(self.path / INDEX_FILE_NAME, "a") as index_file:
+            index_file.write("".join(lines))
+        self.__num_rows += len(descriptors)
+        self.__descriptors = None
+        return rows
+
+    def get_descriptors(
+        self,
+        images: list[Path],
+        describe: Callable[[list[Path]], NDArray[Shape["*, *"], Float32]],
+    ) -> NDArray[Shape["*, *"], Float32]:
+        """
+        Gets descriptors of the images. Only images without stored descriptors
+        are described, and their descriptors are added to the store
+        :param images: Paths to images
+        :param describe: Function computing descriptors of the given images
+        :return: Descriptors of the images
+        """
+        rows = self.find(images)
+        missing = np.flatnonzero(rows < 0)
+        if len(missing) > 0:
+            missing_images = [images[i] for i in missing]
+            rows[missing] = self.add(missing_images, describe(missing_images))
+        return np.asarray(self.descriptors[rows])
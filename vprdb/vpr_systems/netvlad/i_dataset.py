@@ -11,23 +11,27 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import cv2
+
 from pathlib import Path
-from PIL import Image
 from torch.utils.data import Dataset
 
+from vprdb.providers import ColorImageProvider
 from vprdb.vpr_systems.utils import input_transform
 
 
 class IDataset(Dataset):
     def __init__(self, images: list[Path], resize=(480, 640)):
         self.images = images
-        self.transform = input_transform(resize)
+        # Images are resized during decoding, so the transform doesn't resize them
+        self.size = (resize[1], resize[0]) if resize[0] > 0 and resize[1] > 0 else None
+        self.transform = input_transform((0, 0))
 
     def __len__(self):
         return len(self.images)
 
     def __getitem__(self, index):
-        img = Image.open(self.images[index])
-        img = self.transform(img)
+        img = ColorImageProvider(Path(self.images[index])).get_color_image(self.size)
+        img = self.transform(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
 
         return img, index
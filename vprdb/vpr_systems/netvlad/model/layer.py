@@ -34,6 +34,7 @@ class NetVLADModule(nn.Module):
         normalize_input=True,
         vladv2=False,
         use_faiss=True,
+        cluster_chunk_size=None,
     ):
         """
         Args:
@@ -45,6 +46,9 @@ class NetVLADModule(nn.Module):
                 If true, descriptor-wise L2 normalization is applied to input.
             vladv2 : bool
                 If true, use vladv2 otherwise use vladv1
+            cluster_chunk_size : int
+                The number of clusters aggregated at once.
+                If None, all clusters are aggregated at once
         """
         super().__init__()
         self.num_clusters = num_clusters
@@ -55,6 +59,9 @@ class NetVLADModule(nn.Module):
         self.conv = nn.Conv2d(dim, num_clusters, kernel_size=(1, 1), bias=vladv2)
         self.centroids = nn.Parameter(torch.rand(num_clusters, dim))
         self.use_faiss = use_faiss
+        if cluster_chunk_size is not None and cluster_chunk_size < 1:
+            raise ValueError("Cluster chunk size can't be below 1")
+        self.cluster_chunk_size = cluster_chunk_size
 
     def init_params(self, clsts, traindescs):
         if not self.vladv2:
@@ -104,18 +111,20 @@ class NetVLADModule(nn.Module):
 
         x_flatten = x.view(N, C, -1)
 
-        # calculate residuals to each clusters
-        vlad = torch.zeros(
-            [N, self.num_clusters, C], dtype=x.dtype, layout=x.layout, device=x.device
-        )
-        for C in range(
-            self.num_clusters
-        ):  # slower than non-looped, but lower memory usage
-            residual = x_flatten.unsqueeze(0).permute(1, 0, 2, 3) - self.centroids[
-                C : C + 1, :
-            ].expand(x_flatten.size(-1), -1, -1).permute(1, 2, 0).unsqueeze(0)
-            residual *= soft_assign[:, C : C + 1, :].unsqueeze(2)
-            vlad[:, C : C + 1, :] = residual.sum(dim=-1)
+        # Sum of residuals to each cluster is calculated as
+        # soft_assign @ x^T - (sum of soft_assign) * centroids.
+        # Clusters can be processed in chunks to lower memory usage
+        x_transposed = x_flatten.transpose(1, 2)
+        chunk_size = self.cluster_chunk_size or self.num_clusters
+        vlad_chunks = []
+        for start in range(0, self.num_clusters, chunk_size):
+            chunk_assign = soft_assign[:, start : start + chunk_size, :]
+            vlad_chunks.append(
+                torch.bmm(chunk_assign, x_transposed)
+                - chunk_assign.sum(dim=-1).unsqueeze(-1)
+                * self.centroids[start : start + chunk_size, :]
+            )
+        vlad = torch.cat(vlad_chunks, dim=1)
 
         vlad = F.normalize(vlad, p=2, dim=2)  # intra-normalization
         vlad = vlad.view(x.size(0), -1)  # flatten
@@ -15,16 +15,20 @@
 #
 #  Significant part of our code is based on Patch-NetVLAD repository
 #  (https://github.com/QVPR/Patch-NetVLAD)
+import cv2
 import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
+from nptyping import Float32, NDArray, Shape
 from os import makedirs
 from os.path import isfile, join
+from pathlib import Path
 from tensorboardX import SummaryWriter
 from torch.utils.data import DataLoader, SubsetRandomSampler
 from tqdm import tqdm, trange
+from typing import Optional
 
 
 from vprdb.core import (
@@ -33,6 +37,7 @@ from vprdb.core import (
     match_two_databases,
     VoxelGrid,
 )
+from vprdb.vpr_systems.descriptor_store import DescriptorStore
 from vprdb.vpr_systems.netvlad.i_dataset import IDataset
 from vprdb.vpr_systems.netvlad.model import get_backend, get_model, get_pca_encoding
 from vprdb.vpr_systems.netvlad.training import (
@@ -57,6 +62,8 @@ class NetVLAD:
         threads: int = 0,
         batch_size: int = 20,
         use_vladv2: bool = False,
+        cluster_chunk_size: Optional[int] = None,
+        path_to_descriptor_store: Optional[Path] = None,
     ):
         self.cuda = torch.cuda.is_available()
         self.device = torch.device("cuda" if self.cuda else "cpu")
@@ -66,6 +73,7 @@ class NetVLAD:
         self.threads = threads
         self.batch_size = batch_size
         self.use_vladv2 = use_vladv2
+        self.cluster_chunk_size = cluster_chunk_size
 
         if isfile(path_to_weights):
             self.path_to_weights = path_to_weights
@@ -78,30 +86,85 @@ class NetVLAD:
             self.path_to_weights, map_location=lambda storage, loc: storage
         )
         self.num_clusters = self.checkpoint["state_dict"]["pool.centroids"].shape[0]
+        self.num_pcs = self.checkpoint["state_dict"]["WPCA.0.bias"].shape[0]
+        self.__inference_model = None
+        self.__transform = input_transform((0, 0))
+        self.descriptor_store = None
+        if path_to_descriptor_store is not None:
+            self.descriptor_store = DescriptorStore(
+                path_to_descriptor_store,
+                self.path_to_weights,
+                {
+                    "method": "NetVLAD",
+                    "resize": list(self.resize),
+                    "use_vladv2": self.use_vladv2,
+                },
+            )
+
+    @property
+    def inference_model(self) -> nn.Module:
+        """
+        NetVLAD model with the WPCA layer in the evaluation mode.
+        It is built on the first use and kept for the following calls
+        """
+        if self.__inference_model is None:
+            model = get_model(
+                self.encoder,
+                self.encoder_dim,
+                self.num_clusters,
+                self.use_vladv2,
+                append_pca_layer=True,
+                num_pcs=self.num_pcs,
+                cluster_chunk_size=self.cluster_chunk_size,
+            )
+            model.load_state_dict(self.checkpoint["state_dict"])
+            self.__inference_model = model.to(self.device).eval()
+        return self.__inference_model
+
+    def describe(
+        self, images: torch.Tensor | list[np.ndarray]
+    ) -> NDArray[Shape["*, *"], Float32]:
+        """
+        Gets NetVLAD descriptors for a batch of images in memory
+        :param images: Batch of normalized images as a tensor
+        or list of OpenCV BGR images, which are resized and normalized
+        :return: Descriptors for the images
+        """
+        if not isinstance(images, torch.Tensor):
+            images = torch.stack([self.__preprocess(image) for image in images])
+        model = self.inference_model
+        with torch.inference_mode():
+            images = images.to(self.device, non_blocking=True)
+            vlad_global = model.pool(model.encoder(images))
+            vlad_global_pca = get_pca_encoding(model, vlad_global)
+            return vlad_global_pca.cpu().numpy()
+
+    def __preprocess(self, image: np.ndarray) -> torch.Tensor:
+        height, width = self.resize
+        if height > 0 and width > 0 and image.shape[:2] != (height, width):
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        return self.__transform(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
 
     def get_database_descriptors(
         self,
         database: Database,
     ):
         """
-        Gets database RGB images CosPlace descriptors
+        Gets database RGB images NetVLAD descriptors.
+        If the descriptor store is used, only images without stored descriptors are described
         :param database: Database for getting descriptors
         :return: Descriptors for database images
         """
-        num_pcs = self.checkpoint["state_dict"]["WPCA.0.bias"].shape[0]
-
-        model = get_model(
-            self.encoder,
-            self.encoder_dim,
-            self.num_clusters,
-            self.use_vladv2,
-            append_pca_layer=True,
-            num_pcs=num_pcs,
+        color_images_paths = [img.path for img in database.color_images]
+        if self.descriptor_store is None:
+            return self.__compute_descriptors(color_images_paths)
+        return self.descriptor_store.get_descriptors(
+            color_images_paths, self.__compute_descriptors
         )
-        model.load_state_dict(self.checkpoint["state_dict"])
-        model = model.to(self.device)
 
-        color_images_paths = [img.path for img in database.color_images]
+    def __compute_descriptors(
+        self, color_images_paths: list[Path]
+    ) -> NDArray[Shape["*, *"], Float32]:
         dataset = IDataset(color_images_paths, self.resize)
         test_data_loader = DataLoader(
             dataset=dataset,
@@ -110,19 +173,9 @@ class NetVLAD:
             shuffle=False,
             pin_memory=self.cuda,
         )
-        model.eval()
-        with torch.no_grad():
-            db_feat = np.empty((len(dataset), num_pcs), dtype=np.float32)
-            for iteration, (input_data, indices) in tqdm(
-                enumerate(test_data_loader), total=len(test_data_loader)
-            ):
-                indices_np = indices.detach().numpy()
-                input_data = input_data.to(self.device)
-                image_encoding = model.encoder(input_data)
-                vlad_global = model.pool(image_encoding)
-                vlad_global_pca = get_pca_encoding(model, vlad_global)
-                db_feat[indices_np, :] = vlad_global_pca.detach().cpu().numpy()
-
+        db_feat = np.empty((len(dataset), self.num_pcs), dtype=np.float32)
+        for input_data, indices in tqdm(test_data_loader, total=len(test_data_loader)):
+            db_feat[indices.numpy()] = self.describe(input_data)
         return db_feat
 
     def fine_tune_model(
@@ -132,6 +185,7 @@ class NetVLAD:
         train_db: Database,
         save_dir: str,
         voxel_size: float = 0.3,
+        anchor_at_origin: bool = False,
         seed=42,
         add_pca=True,
         optim_name="SGD",
@@ -157,13 +211,19 @@ class NetVLAD:
         :param train_db: Training database
         :param save_dir: Directory for saving output model and log
         :param voxel_size: Voxel size for down sampling point clouds
+        :param anchor_at_origin: Whether to anchor the voxel grid at the origin
+        instead of the scene bounds. Bounds aren't calculated in this case,
+        but voxels are shifted relative to the bounds-anchored grid,
+        so the results may slightly differ
         :return: Path to output model
         """
-        min_bounds, max_bounds = find_bounds_for_multiple_databases(
-            [target_db, valid_db, train_db]
-        )
-
-        voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
+        if anchor_at_origin:
+            voxel_grid = VoxelGrid.from_origin(voxel_size)
+        else:
+            min_bounds, max_bounds = find_bounds_for_multiple_databases(
+                [target_db, valid_db, train_db]
+            )
+            voxel_grid = VoxelGrid(min_bounds, max_bounds, voxel_size)
         train_targets = match_two_databases(train_db, target_db, voxel_grid)
         val_targets = match_two_databases(valid_db, target_db, voxel_grid)
 
@@ -175,6 +235,9 @@ class NetVLAD:
 
         scheduler = None
 
+        # The encoder is shared with the inference model and is changed by training,
+        # so the inference model is rebuilt from the original weights on the next use
+        self.__inference_model = None
         checkpoint = torch.load(
             self.path_to_weights, map_location=lambda storage, loc: storage
         )
@@ -183,7 +246,11 @@ class NetVLAD:
         del checkpoint["state_dict"]["WPCA.0.bias"]
 
         model = get_model(
-            self.encoder, self.encoder_dim, self.num_clusters, self.use_vladv2
+            self.encoder,
+            self.encoder_dim,
+            self.num_clusters,
+            self.use_vladv2,
+            cluster_chunk_size=self.cluster_chunk_size,
         )
         model.load_state_dict(checkpoint["state_dict"])
 
@@ -315,6 +382,7 @@ class NetVLAD:
                 self.encoder_dim,
                 self.num_clusters,
                 append_pca_layer=False,
+                cluster_chunk_size=self.cluster_chunk_size,
             )
             model.load_state_dict(checkpoint["state_dict"])
             model = model.to(self.device)
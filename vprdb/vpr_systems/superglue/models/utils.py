@@ -46,18 +46,25 @@
 import cv2
 import torch
 
+from pathlib import Path
+
+from vprdb.providers import ColorImageProvider
+
 
 def frame2tensor(frame, device):
     return torch.from_numpy(frame / 255.0).float()[None, None].to(device)
 
 
 def read_image(path, device, resize, resize_float):
-    image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
-
     if resize_float:
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
         image = cv2.resize(image.astype("float32"), resize)
     else:
-        image = cv2.resize(image, resize).astype("float32")
+        # Image is decoded at reduced resolution if possible
+        image = ColorImageProvider(Path(path)).get_color_image(
+            resize, grayscale=True, interpolation=cv2.INTER_LINEAR
+        )
+        image = image.astype("float32")
 
     inp = frame2tensor(image, device)
     return inp
@@ -16,6 +16,9 @@ import random
 import torch
 import torchvision.transforms as transforms
 
+from pathlib import Path
+from PIL import Image
+
 
 def make_deterministic(seed=0):
     """Make results deterministic. If seed == -1, do not make deterministic"""
@@ -38,3 +41,22 @@ def input_transform(resize=(480, 640)):
     if resize[0] > 0 and resize[1] > 0:
         transforms_list = [transforms.Resize(resize)] + transforms_list
     return transforms.Compose(transforms_list)
+
+
+def make_size_buckets(images: list[Path], batch_size: int) -> list[list[int]]:
+    """
+    Splits images into batches so that every batch contains images of the same size.
+    Sizes are read from the headers of the images without decoding them
+    :param images: Paths to images
+    :param batch_size: Maximum size of a batch
+    :return: Indices of images in each batch
+    """
+    buckets = dict()
+    for i, path_to_image in enumerate(images):
+        with Image.open(path_to_image) as image:
+            buckets.setdefault(image.size, []).append(i)
+    return [
+        bucket[start : start + batch_size]
+        for bucket in buckets.values()
+        for start in range(0, len(bucket), batch_size)
+    ]